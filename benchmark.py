@@ -0,0 +1,1202 @@
+"""Measure the throughput of the othello engine.
+
+python benchmark.py [section ...]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bitboard import OthelloGame, batch, core, get_backend, set_backend
+from bitboard import features, record, symmetry, zobrist
+from bitboard.bitboard import BitBoard
+from matching import selfplay
+from matching.headless import play_match
+from matching.lockstep import play_lockstep
+from matching.pool import MatchPool
+from strategy import Strategy, book, parallel
+from strategy.endgame import Endgame
+from strategy.evaluation import IncrementalEvaluator
+from strategy.minmax import Minmax
+from strategy.negamax import Negamax
+from strategy.parallel import ParallelSearch, get_pool
+from strategy.pattern import PatternEvaluator, load_weights
+from strategy.search_cache import SearchCache
+from strategy.shared_table import SharedTranspositionTable
+from strategy.transposition import TranspositionTable
+
+
+def sample_positions(games=200, seed=0):
+    """Collect (player, opponent, put_loc) of every legal move in random games.
+
+    Parameters
+    ----------
+    games : int
+        Number of random games to be played.
+    seed : int
+        Seed of random module.
+
+    Returns
+    -------
+    positions : list of tuple
+        Player's board, opponent's board and the index of a legal move.
+    """
+    rng = random.Random(seed)
+    board = BitBoard()
+    positions = []
+    for _ in range(games):
+        player, opponent = BitBoard.INIT_BLACK, BitBoard.INIT_WHITE
+        while True:
+            reversible = board.reversible_area(0, player, opponent)
+            if not reversible:
+                player, opponent = opponent, player
+                if not board.reversible_area(0, player, opponent):
+                    break
+                continue
+            candidates = [
+                num for num in range(64) if (reversible >> num) & 1]
+            positions.extend(
+                (player, opponent, candidate) for candidate in candidates)
+            put_loc = 1 << rng.choice(candidates)
+            player, opponent = board.simulate_play(
+                0, put_loc, player, opponent)
+            player, opponent = opponent, player
+    return positions
+
+
+def legacy_simulate_play(turn, put_loc, black_board, white_board):
+    """The former `BitBoard.simulate_play` walking each direction."""
+    board = [black_board, white_board]
+    reverse_bit = 0
+    for direction in range(8):
+        reverse_bit_ = 0
+        border_bit = BitBoard._check_surround(put_loc, direction)
+        while border_bit & board[turn ^ 1]:
+            reverse_bit_ |= border_bit
+            border_bit = BitBoard._check_surround(border_bit, direction)
+        if border_bit & board[turn]:
+            reverse_bit |= reverse_bit_
+    board[turn] ^= (put_loc | reverse_bit)
+    board[turn ^ 1] ^= reverse_bit
+    return board
+
+
+def legacy_evaluate_value(strategy, black_board, white_board):
+    """The former `Minmax.evaluate_value` looping over the 64 squares."""
+    evaluation = 0
+    board = [black_board, white_board]
+    phase = strategy.touch_border(black_board, white_board)
+    for position in range(64):
+        if (strategy._EXP2[position] & board[strategy._player_clr]):
+            evaluation += strategy._EVAL_TBL[phase][position]
+        if (strategy._EXP2[position] & board[strategy._player_clr ^ 1]):
+            evaluation -= strategy._EVAL_TBL[phase][position]
+    return evaluation
+
+
+def timer(function, cases, repeat=3):
+    """Return the best number of calls per second of function(*case)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for case in cases:
+            function(*case)
+        best = min(best, time.perf_counter() - start)
+    return len(cases) / best
+
+
+def report(label, per_sec, baseline=None):
+    if baseline is None:
+        print("%-32s %12.0f /s" % (label, per_sec))
+    else:
+        print("%-32s %12.0f /s  x%.2f" % (label, per_sec, per_sec/baseline))
+
+
+def bench_flip(positions):
+    """Flips per second of `BitBoard.simulate_play`, before and after."""
+    board = BitBoard()
+    cases = [
+        (0, 1 << put_loc, player, opponent)
+        for player, opponent, put_loc in positions
+    ]
+    for case in cases:
+        if list(board.simulate_play(*case)) != legacy_simulate_play(*case):
+            raise AssertionError("Flip engine disagrees with the legacy one.")
+
+    print("simulate_play (%d moves)" % len(cases))
+    before = timer(legacy_simulate_play, cases)
+    report("  direction walk", before)
+    report("  shift/mask engine", timer(board.simulate_play, cases), before)
+
+
+def bench_backend(positions):
+    """Compare the shift-based and table-driven flip engines."""
+    board = BitBoard()
+    cases = [
+        (0, 1 << put_loc, player, opponent)
+        for player, opponent, put_loc in positions
+    ]
+    backend = get_backend()
+    expected = [board.simulate_play(*case) for case in cases]
+
+    print("backends (%d moves)" % len(cases))
+    baseline = None
+    for name in ("shift", "table"):
+        set_backend(name)
+        if [board.simulate_play(*case) for case in cases] != expected:
+            raise AssertionError("Backend %s disagrees." % name)
+        per_sec = timer(board.simulate_play, cases)
+        report("  simulate_play [%s]" % name, per_sec, baseline)
+        baseline = baseline or per_sec
+    baseline = timer(
+        lambda turn, put_loc, black_board, white_board: (
+            put_loc & board.reversible_area(turn, black_board, white_board)
+            ) == put_loc,
+        cases)
+    report("  is_reversible [full area]", baseline)
+    for name in ("shift", "table"):
+        set_backend(name)
+        per_sec = timer(board.is_reversible, cases)
+        report("  is_reversible [%s]" % name, per_sec, baseline)
+    set_backend(backend)
+
+
+def bench_batch(positions):
+    """Boards per second of the numpy batch API against the scalar path."""
+    board = BitBoard()
+    player = np.array([case[0] for case in positions], dtype=np.uint64)
+    opponent = np.array([case[1] for case in positions], dtype=np.uint64)
+    put_loc = np.array([case[2] for case in positions], dtype=np.int64)
+    if [int(x) for x in batch.moves(player, opponent)] != [
+            core.moves(case[0], case[1]) for case in positions]:
+        raise AssertionError("Batch moves disagree with the scalar path.")
+    if [int(x) for x in batch.flip(player, opponent, put_loc)] != [
+            core.flip(*case) for case in positions]:
+        raise AssertionError("Batch flips disagree with the scalar path.")
+
+    def per_sec(function, *args):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            function(*args)
+            best = min(best, time.perf_counter() - start)
+        return len(positions) / best
+
+    print("batch (%d boards)" % len(positions))
+    cases = [(0, case[0], case[1]) for case in positions]
+    baseline = timer(board.reversible_area, cases)
+    report("  reversible_area", baseline)
+    report("  batch.moves", per_sec(batch.moves, player, opponent), baseline)
+    cases = [(0, 1 << case[2], case[0], case[1]) for case in positions]
+    baseline = timer(board.simulate_play, cases)
+    report("  simulate_play", baseline)
+    report(
+        "  batch.flip", per_sec(batch.flip, player, opponent, put_loc),
+        baseline)
+    baseline = timer(board.count_disks, [case[:2] for case in positions])
+    report("  count_disks", baseline)
+    report("  batch.count", per_sec(batch.count, player), baseline)
+
+
+def check_zobrist(games=200, seed=0):
+    """Check the incremental key equals the key from scratch in every ply.
+
+    Returns
+    -------
+    updates : list of tuple
+        Arguments of every `zobrist.update_key` call in the games.
+    """
+    rng = random.Random(seed)
+    updates = []
+    for _ in range(games):
+        board = [BitBoard.INIT_BLACK, BitBoard.INIT_WHITE]
+        turn = 0
+        key = zobrist.hash_board(*board, turn)
+        while not core.is_finished(*board):
+            reversible = core.moves(board[turn], board[turn ^ 1])
+            if reversible:
+                put_loc = rng.choice(
+                    [num for num in range(64) if (reversible >> num) & 1])
+                reverse_bit = core.flip(board[turn], board[turn ^ 1], put_loc)
+                updates.append((key, turn, put_loc, reverse_bit))
+                key = zobrist.update_key(key, turn, put_loc, reverse_bit)
+                board[turn] ^= reverse_bit | (1 << put_loc)
+                board[turn ^ 1] ^= reverse_bit
+            else:
+                key = zobrist.pass_key(key)
+            turn ^= 1
+            if key != zobrist.hash_board(*board, turn):
+                raise AssertionError("Incremental key disagrees.")
+    return updates
+
+
+def bench_zobrist(positions):
+    """Keys per second of the incremental Zobrist key and the former key."""
+    updates = check_zobrist()
+    cases = [case[:2] for case in positions]
+
+    print("zobrist (%d positions, %d updates)" % (len(cases), len(updates)))
+    baseline = timer(
+        lambda black, white: "".join([str(white), str(black)]), cases)
+    report("  string key", baseline)
+    report("  hash_board", timer(zobrist.hash_board, cases), baseline)
+    report("  update_key", timer(zobrist.update_key, updates), baseline)
+
+
+def search_games(positions, number=20):
+    """Return OthelloGame of the first positions of the sample, in order."""
+    games = []
+    for player, opponent, _ in positions:
+        if games and games[-1].board.return_board() == (player, opponent):
+            continue
+        game = OthelloGame("black")
+        game.board.load_board(player, opponent)
+        games.append(game)
+        if len(games) == number:
+            break
+    return games
+
+
+def bench_table(positions):
+    """Searches per second of Minmax with and without the table."""
+    games = search_games(positions)
+    print("transposition table (%d searches at depth 4)" % len(games))
+    baseline = None
+    for label, memory in (("no table", 0), ("table", 4 << 20)):
+        strategy = Minmax(4, memory)
+        per_sec = timer(strategy.put_disk, [(game,) for game in games], 1)
+        report("  " + label, per_sec, baseline)
+        baseline = baseline or per_sec
+        if strategy.table is not None:
+            print("  ", strategy.table.stats())
+
+    # Few positions repeat in a single search at depth 4. The table pays
+    # when the earlier iterations leave their best moves in it.
+    print("transposition table (%d searches by iterative deepening to "
+          "depth 6)" % len(games))
+    for cls in (Minmax, Negamax):
+        baseline = None
+        for label, memory in (("no table", 0), ("table", 4 << 20)):
+            strategy = cls(6, memory, time_limit=1000.)
+            per_sec = timer(
+                strategy.put_disk, [(game,) for game in games], 1)
+            report("  %s, %s" % (cls.__name__, label), per_sec, baseline)
+            baseline = baseline or per_sec
+            if strategy.table is not None:
+                print("  ", strategy.table.stats())
+
+    try:
+        TranspositionTable.pack(0.5, 1, TranspositionTable.EXACT, 0, 0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("A value of 0.5 was truncated and stored.")
+
+
+def bench_symmetry(positions):
+    """Canonical positions per second, after checking the symmetries."""
+    cases = [case[:2] for case in positions]
+    for player, opponent in cases[::97]:
+        reversible = core.moves(player, opponent)
+        for sym in range(8):
+            if core.moves(
+                    symmetry.transform(player, sym),
+                    symmetry.transform(opponent, sym),
+                    ) != symmetry.transform(reversible, sym):
+                raise AssertionError("Symmetry %d breaks moves." % sym)
+        canon_player, canon_opponent, sym = symmetry.canonical(
+            player, opponent)
+        if (canon_player, canon_opponent) != min(
+                (symmetry.transform(player, sym_),
+                 symmetry.transform(opponent, sym_)) for sym_ in range(8)):
+            raise AssertionError("Canonical position is not minimal.")
+
+    print("symmetry (%d positions)" % len(cases))
+    report("  canonical", timer(symmetry.canonical, cases))
+    print("  %d distinct, %d canonical" % (
+        len(set(cases)),
+        len({symmetry.canonical(*case)[:2] for case in cases})))
+
+
+def bench_endgame(positions, empties=(8, 10, 12)):
+    """Nodes per second of the endgame solver in both modes."""
+    print("endgame")
+    for empty in empties:
+        cases = []
+        for player, opponent, _ in positions:
+            if 64 - core.count(player | opponent) == empty \
+                    and (player, opponent) not in cases:
+                cases.append((player, opponent))
+        cases = cases[:5]
+        for exact, label in ((True, "exact"), (False, "win/loss/draw")):
+            solver = Endgame(empty, exact)
+            nodes = 0
+            elapsed = 0.
+            for case in cases:
+                solver.solve(*case)
+                nodes += solver.nodes
+                elapsed += solver.elapsed
+            print("  %2d empties %-14s %9d nodes %9.0f nodes/s %7.3f s" % (
+                empty, label, nodes/len(cases), nodes/elapsed,
+                elapsed/len(cases)))
+
+    # A solver out of time falls back to the search within the limit.
+    games = []
+    for player, opponent, _ in positions:
+        if 64 - core.count(player | opponent) == 16:
+            game = OthelloGame("black")
+            game.board.load_board(player, opponent)
+            games.append(game)
+    time_limit = 0.1
+    strategy = Minmax(64, 4 << 20, 16, time_limit)
+    slowest = 0.
+    for game in games[:5]:
+        start = time.perf_counter()
+        strategy.put_disk(game)
+        slowest = max(slowest, time.perf_counter() - start)
+    if slowest > 2 * time_limit:
+        raise AssertionError("A move took %.3f s." % slowest)
+    print("  16 empties in %.2f s limit: slowest move %.3f s" % (
+        time_limit, slowest))
+
+
+def bench_deepening(positions, time_limits=(0.05, 0.2, 1.)):
+    """Depth reached and the slowest move under a time limit per move."""
+    games = search_games(positions, 10)
+    print("iterative deepening (%d searches)" % len(games))
+    for time_limit in time_limits:
+        strategy = Minmax(64, 4 << 20, time_limit=time_limit)
+        depths = []
+        slowest = 0.
+        for game in games:
+            start = time.perf_counter()
+            strategy.put_disk(game)
+            slowest = max(slowest, time.perf_counter() - start)
+            depths.append(strategy.completed_depth)
+        print("  %5.2f s limit: depth %d-%d, slowest move %.3f s" % (
+            time_limit, min(depths), max(depths), slowest))
+
+
+def bench_negamax(positions, depths=(4, 5)):
+    """Nodes of Minmax and Negamax at equal depth, without the table."""
+    games = search_games(positions)
+    print("negamax (%d searches, no table and no endgame solver)"
+          % len(games))
+    for depth in depths:
+        baseline = None
+        for label, strategy in (
+                ("min-max", Minmax(depth, 0, 0)),
+                ("alpha-beta", Negamax(depth, 0, 0, pvs=False)),
+                ("pvs", Negamax(depth, 0, 0)),
+                ):
+            nodes = 0
+            start = time.perf_counter()
+            for game in games:
+                strategy.put_disk(game)
+                nodes += strategy.nodes
+            elapsed = time.perf_counter() - start
+            baseline = baseline or nodes
+            print("  depth %d %-11s %9d nodes (x%.2f) %7.3f s" % (
+                depth, label, nodes, nodes/baseline, elapsed))
+
+    # The null window is empty only between intagers, so the scores of an
+    # evaluator of fractions are rounded.
+    weighted = Negamax(0, 0, 0)
+
+    def fraction(player, opponent):
+        return weighted.evaluate(player, opponent) / 7
+
+    searches = [
+        Negamax(4, 0, 0, pvs=pvs, evaluator=fraction)
+        for pvs in (False, True)]
+    for game in games:
+        board = game.board.return_board()
+        results = [
+            strategy.search(*board, game.turn, 4) for strategy in searches]
+        if results[0][0] != results[1][0] \
+                or not isinstance(results[1][0], int):
+            raise AssertionError(
+                "PVS gave %s and alpha-beta %s." % (results[1], results[0]))
+    print("  pvs and alpha-beta agree on intagers with fractional "
+          "evaluations")
+
+
+def bench_ordering(positions, depth=5):
+    """Nodes and cutoffs by the first move, with and without ordering."""
+    games = search_games(positions)
+    print("move ordering (%d searches at depth %d, no table)"
+          % (len(games), depth))
+    for label, Search in (("min-max", Minmax), ("negamax", Negamax)):
+        for ordering in (False, True):
+            strategy = Search(depth, 0, 0, ordering=ordering)
+            nodes = 0
+            start = time.perf_counter()
+            for game in games:
+                strategy.put_disk(game)
+                nodes += strategy.nodes
+            elapsed = time.perf_counter() - start
+            print("  %-7s %-11s %8d nodes %7.3f s  first cutoff %.1f%%" % (
+                label, "ordered" if ordering else "square order", nodes,
+                elapsed,
+                strategy.ordering.stats()["first_cutoff_rate"] * 100))
+
+
+def bench_evaluation(positions):
+    """Evaluations per second of the row tables against the former loop."""
+    strategy = Minmax()
+    cases = [(player, opponent) for player, opponent, _ in positions]
+    for player_clr in (BitBoard.BLACK, BitBoard.WHITE):
+        strategy._player_clr = player_clr
+        for case in cases:
+            if strategy.evaluate_value(*case) \
+                    != legacy_evaluate_value(strategy, *case):
+                raise AssertionError("Evaluations differ.")
+
+    print("evaluation (%d positions)" % len(cases))
+    baseline = timer(
+        lambda *case: legacy_evaluate_value(strategy, *case), cases)
+    report("  64-square loop", baseline)
+    report("  row tables", timer(strategy.evaluate_value, cases), baseline)
+
+
+def check_incremental(games=50, seed=0):
+    """Check the incremental score equals the score from scratch.
+
+    Every legal move of every ply is made and unmade, and the game goes on
+    by a random one of them.
+
+    Returns
+    -------
+    moves : list of tuple
+        Arguments of every `IncrementalEvaluator.make` call in the games.
+    """
+    strategy = Minmax()
+    incremental = IncrementalEvaluator(strategy._evaluators)
+    rng = random.Random(seed)
+    moves = []
+
+    def check(black_board, white_board):
+        for player_clr in (BitBoard.BLACK, BitBoard.WHITE):
+            strategy._player_clr = player_clr
+            if incremental.value(player_clr) \
+                    != strategy.evaluate_value(black_board, white_board):
+                raise AssertionError("Incremental score disagrees.")
+
+    for _ in range(games):
+        board = [BitBoard.INIT_BLACK, BitBoard.INIT_WHITE]
+        turn = 0
+        incremental.reset(*board)
+        while not core.is_finished(*board):
+            reversible = core.moves(board[turn], board[turn ^ 1])
+            candidates = [
+                num for num in range(64) if (reversible >> num) & 1]
+            for put_loc in candidates:
+                reverse_bit = core.flip(board[turn], board[turn ^ 1], put_loc)
+                after = board.copy()
+                after[turn] ^= reverse_bit | (1 << put_loc)
+                after[turn ^ 1] ^= reverse_bit
+                moves.append((turn, put_loc, reverse_bit, *after))
+                incremental.make(turn, put_loc, reverse_bit, *after)
+                check(*after)
+                incremental.unmake()
+                check(*board)
+            if candidates:
+                put_loc = rng.choice(candidates)
+                reverse_bit = core.flip(board[turn], board[turn ^ 1], put_loc)
+                board[turn] ^= reverse_bit | (1 << put_loc)
+                board[turn ^ 1] ^= reverse_bit
+                incremental.make(turn, put_loc, reverse_bit, *board)
+                check(*board)
+            turn ^= 1
+    return moves
+
+
+def bench_incremental(positions):
+    """Scores per second of the incremental evaluator and from scratch."""
+    moves = check_incremental()
+    strategy = Minmax(incremental=True)
+    strategy._player_clr = BitBoard.BLACK
+    incremental = strategy.incremental
+
+    def make_unmake(*move):
+        incremental.make(*move)
+        incremental.value(BitBoard.BLACK)
+        incremental.unmake()
+
+    print("incremental evaluation (%d moves)" % len(moves))
+    baseline = timer(
+        strategy.evaluate_value, [move[3:] for move in moves])
+    report("  evaluate_value", baseline)
+    report("  make, value, unmake", timer(make_unmake, moves), baseline)
+
+    # Every node pays for make and unmake, and most of them are leaves.
+    games = search_games(positions, 10)
+    baseline = None
+    for label, incremental in (("from scratch", False),
+                               ("incremental", True)):
+        strategy = Negamax(5, 0, incremental=incremental)
+        per_sec = timer(strategy.put_disk, [(game,) for game in games], 1)
+        report("  negamax depth 5, " + label, per_sec, baseline)
+        baseline = baseline or per_sec
+
+
+def bench_pattern(positions):
+    """Evaluations per second of the pattern evaluator."""
+    strategy = Minmax()
+    weighted = strategy._evaluators[1]
+    evaluator = PatternEvaluator.from_square_weights(weighted.weights)
+    player = np.array([case[0] for case in positions], dtype=np.uint64)
+    opponent = np.array([case[1] for case in positions], dtype=np.uint64)
+    expected = [weighted(case[0], case[1]) for case in positions]
+    evaluations = evaluator.evaluate_batch(player, opponent)
+    if np.rint(evaluations / PatternEvaluator.SCALE).tolist() != expected:
+        raise AssertionError("Patterns disagree with the weighted squares.")
+    if [evaluator(*case[:2]) for case in positions[::20]] \
+            != evaluations[::20].tolist():
+        raise AssertionError("A position disagrees with the batch.")
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "weights.bin")
+        evaluator.save(filename)
+        loaded = load_weights(filename)
+        missing = load_weights(os.path.join(directory, "missing.bin"))
+    if not np.array_equal(loaded.weights, evaluator.weights):
+        raise AssertionError("Loaded weights differ.")
+    if missing is not None:
+        raise AssertionError("Weights were made without a file.")
+
+    print("pattern evaluation (%d positions, %d weights per stage)" % (
+        len(positions), PatternEvaluator.SIZE))
+    cases = [case[:2] for case in positions]
+    baseline = timer(weighted, cases)
+    report("  weighted squares", baseline)
+    report("  patterns", timer(evaluator, cases[::20], 1), baseline)
+
+    def one_by_batch(player, opponent):
+        return evaluator.evaluate_batch([player], [opponent])[0]
+
+    report(
+        "  patterns [batch of 1]", timer(one_by_batch, cases[::20], 1),
+        baseline)
+    start = time.perf_counter()
+    evaluator.evaluate_batch(player, opponent)
+    report(
+        "  patterns [batch]",
+        len(positions) / (time.perf_counter() - start), baseline)
+
+    games = search_games(positions, 10)
+    for label, search in (
+            ("weighted squares", Negamax(3, 0, 0)),
+            ("patterns", Negamax(3, 0, 0, evaluator=evaluator)),
+            ):
+        nodes = 0
+        start = time.perf_counter()
+        for game in games:
+            search.put_disk(game)
+            nodes += search.nodes
+        report(
+            "  negamax nodes [%s]" % label,
+            nodes / (time.perf_counter() - start))
+
+
+def bench_features(positions):
+    """Positions per second of each bitboard feature."""
+    cases = [case[:2] for case in positions]
+    print("features (%d positions)" % len(cases))
+    baseline = timer(core.moves, cases)
+    report("  moves", baseline)
+    for label, function in (
+            ("stable", features.stable),
+            ("frontier", features.frontier),
+            ("potential_mobility", features.potential_mobility),
+            ("regions", features.regions),
+            ("features", features.features),
+            ):
+        report("  " + label, timer(function, cases), baseline)
+    means = np.mean(
+        [features.features(*case) for case in cases[::10]], axis=0)
+    for name, mean in zip(features.FEATURES, means):
+        print("  mean %-28s %6.2f" % (name, mean))
+
+
+def worker_searches(_):
+    """Return the number of searches cached in a worker of the pool."""
+    return len(parallel._searches)
+
+
+def bench_parallel(positions, depth=5, workers=(2, 4)):
+    """Check the root-splitting search against Negamax.
+
+    Speedups are not reported, since they need a machine of several CPUs.
+    """
+    games = search_games(positions[::len(positions) // 10], 10)
+    print("parallel search (%d searches at depth %d, %d cpus)" % (
+        len(games), depth, os.cpu_count()))
+    serial = Negamax(depth, 0, 0)
+    for number in workers:
+        strategy = ParallelSearch(depth, 0, 0, workers=number)
+        for game in games:
+            board = game.board.return_board()
+            value = strategy.search(*board, game.turn, depth)[0]
+            if value != serial.search(*board, game.turn, depth)[0]:
+                raise AssertionError(
+                    "%d workers disagree with Negamax." % number)
+        strategy.close()
+    print("  values of %s workers agree with Negamax" % (
+        ", ".join(map(str, workers))))
+
+    # Searches of former strategies must not stay in the workers.
+    for _ in range(10):
+        strategy = ParallelSearch(3, endgame=0, workers=2)
+        strategy.put_disk(games[0])
+        strategy.close()
+    cached = max(get_pool(2)[0].map(worker_searches, range(8)))
+    if cached > 1:
+        raise AssertionError("%d searches are left in a worker." % cached)
+    print("  searches left in a worker after 10 strategies: %d" % cached)
+
+
+def stress_shared_table(table, seed, number=20000):
+    """Store and probe entries derived from their keys in a process.
+
+    Returns
+    -------
+    broken : int
+        Number of probes which returned data of another key.
+    stats : dict
+    """
+    rng = random.Random(seed)
+    broken = 0
+    for _ in range(number):
+        key = rng.getrandbits(64)
+        entry = (key % 1000 - 500, key % 100, 1 + key % 3, key % 64)
+        table.store(key, entry[1], entry[2], entry[0], entry[3])
+        probe = table.probe(rng.getrandbits(64) if key & 1 else key)
+        if probe is not None and probe != entry:
+            broken += 1
+    return broken, table.stats()
+
+
+def open_searches(number=30, workers=2):
+    """Create and close parallel searches in a pool started before them."""
+    list(get_pool(workers)[0].map(abs, range(workers)))
+    game = OthelloGame()
+    for _ in range(number):
+        strategy = ParallelSearch(3, endgame=0, workers=workers)
+        strategy.put_disk(game)
+        strategy.close()
+
+
+def bench_shared(positions, workers=4):
+    """Check the shared table across processes and search with it."""
+    table = SharedTranspositionTable(1 << 16)
+    with ProcessPoolExecutor(workers) as executor:
+        results = list(executor.map(
+            stress_shared_table, [table] * workers, range(workers)))
+    print("shared transposition table (%d entries, %d processes)" % (
+        len(table), workers))
+    for broken, stats in results:
+        if broken:
+            raise AssertionError("Entries of other keys were read.")
+        print("  stores %(stores)d, overwrites %(overwrites)d, "
+              "hits %(hits)d, collisions %(collisions)d" % stats)
+    print("  occupancy %.2f" % table.occupancy())
+    table.close()
+
+    games = search_games(positions[::len(positions) // 10], 10)
+    for label, memory in (("private tables", 0), ("shared table", 4 << 20)):
+        strategy = ParallelSearch(5, memory, 0, workers=workers)
+        executor = get_pool(workers)[0]
+        list(executor.map(abs, range(workers)))
+        nodes = 0
+        start = time.perf_counter()
+        for game in games:
+            strategy.put_disk(game)
+            nodes += strategy.nodes
+        print("  %-15s %9d nodes %7.3f s" % (
+            label, nodes, time.perf_counter() - start))
+        if strategy.table is not None:
+            print("  ", strategy.table.stats())
+        strategy.close()
+
+    # Workers with their own resource trackers must not track the blocks.
+    before = set(os.listdir("/dev/shm"))
+    process = subprocess.run(
+        [sys.executable, "-c", "import benchmark; benchmark.open_searches()"],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)))
+    left = [
+        name for name in set(os.listdir("/dev/shm")) - before
+        if name.startswith("psm_")]
+    warnings = process.stderr.count("resource_tracker")
+    if process.returncode or left or warnings:
+        raise AssertionError("%d blocks and %d warnings were left:\n%s" % (
+            len(left), warnings, process.stderr))
+    print("  30 searches closed: no blocks or warnings left")
+
+
+def bench_book(positions, plies=5, depth=3):
+    """Build a small opening book and look up its symmetric positions."""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "book.bin")
+        start = time.perf_counter()
+        number = book.build_book(Negamax(depth, 4 << 20, 0), plies, filename)
+        print("opening book (%d positions within %d plies at depth %d, "
+              "built in %.2f s)" % (
+                  number, plies, depth, time.perf_counter() - start))
+
+        start = time.perf_counter()
+        opening = book.OpeningBook(filename)
+        opening.lookup(BitBoard.INIT_BLACK, BitBoard.INIT_WHITE)
+        print("  open and first lookup %.6f s" % (
+            time.perf_counter() - start))
+        def child_key(player, opponent, move):
+            reverse_bit = core.flip(player, opponent, move)
+            return book.position_key(
+                opponent ^ reverse_bit, player ^ reverse_bit ^ (1 << move))[0]
+
+        # A symmetric position may get a symmetric move of the same result.
+        cases = []
+        for player, opponent in book.expand(plies).values():
+            expected = child_key(
+                player, opponent, opening.lookup(player, opponent)[0])
+            for sym in range(8):
+                case = (symmetry.transform(player, sym),
+                        symmetry.transform(opponent, sym))
+                if child_key(*case, opening.lookup(*case)[0]) != expected:
+                    raise AssertionError("Symmetric positions disagree.")
+                cases.append(case)
+        report("  lookup [in book]", timer(opening.lookup, cases))
+        misses = [case[:2] for case in positions[::100]]
+        report("  lookup [sampled]", timer(opening.lookup, misses))
+
+        # A won line is flagged, not only clamped to the highest score.
+        initial = (BitBoard.INIT_BLACK, BitBoard.INIT_WHITE)
+        key = book.position_key(*initial)[0]
+        won = os.path.join(directory, "won.bin")
+        book.write_book(
+            [(key, opening.find(key)[1], Negamax.WIN_VALUE)], won,
+            Negamax.WIN_VALUE)
+        opening.close()
+        opening = book.OpeningBook(won)
+        if opening.lookup(*initial)[1:] != (0x7fff, 1):
+            raise AssertionError("A won line was not flagged.")
+        opening.close()
+
+
+def bench_cache(positions):
+    """Compare the search cache with the pickled dict of MinmaxNew."""
+    rng = random.Random(0)
+    records = [
+        (player, opponent, rng.randrange(2), rng.randrange(4, 10),
+         float(rng.randrange(-500, 500)), put_loc, rng.randrange(2))
+        for player, opponent, put_loc in positions
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "cache.bin")
+        cache = SearchCache(filename)
+        start = time.perf_counter()
+        for black, white, turn, depth, value, move, color in records:
+            cache.put(black, white, turn, depth, value, move, color)
+        cache.flush()
+        cache.compact()
+        print("search cache (%d records, written in %.3f s, %d bytes)" % (
+            len(cache), time.perf_counter() - start,
+            os.path.getsize(filename)))
+
+        # The dict of MinmaxNew holds the same records.
+        hash_log = {}
+        for black, white, turn, depth, value, move, color in records:
+            hash_log.setdefault("%d%d%d" % (color, turn, depth), {})[
+                "%d%d" % (black, white)] = (value, move)
+        pickled = os.path.join(directory, "cache.pkl")
+        with open(pickled, "wb") as file_:
+            pickle.dump(hash_log, file_)
+        start = time.perf_counter()
+        with open(pickled, "rb") as file_:
+            pickle.load(file_)
+        print("  pickle load %.6f s (%d bytes)" % (
+            time.perf_counter() - start, os.path.getsize(pickled)))
+        cache.close()
+        start = time.perf_counter()
+        cache.get(*records[0][:4], records[0][6])
+        print("  open and first lookup %.6f s" % (
+            time.perf_counter() - start))
+
+        # A position given twice keeps the last record.
+        expected = dict(
+            ((black, white, turn, depth, color), value)
+            for black, white, turn, depth, value, move, color in records)
+        for (black, white, turn, depth, color), value in expected.items():
+            if cache.get(black, white, turn, depth, color)[0] != value:
+                raise AssertionError("A record was lost.")
+        cases = [record[:4] + record[6:] for record in records]
+        report("  lookup [cached]", timer(cache.get, cases))
+        cases = [case[:4] + (case[4] ^ 1,) for case in cases]
+        report("  lookup [missing]", timer(cache.get, cases))
+
+        # Records appended after the compaction, and one cut by a crash.
+        cache.put(0, 0, 0, 4, 1., 1)
+        cache.flush()
+        cache.close()
+        with open(filename, "ab") as file_:
+            file_.write(b"\0" * 5)
+        if SearchCache(filename).get(0, 0, 0, 4) != (1., 1):
+            raise AssertionError("An appended record was lost.")
+
+        cache = SearchCache(filename, max_records=len(expected) // 2)
+        cache.compact()
+        kept = [position[3] for position in expected
+                if cache.get(*position) is not None]
+        evicted = [position[3] for position in expected
+                   if cache.get(*position) is None]
+        if len(cache) != len(expected) // 2 or min(kept) < max(evicted):
+            raise AssertionError("Deep records were evicted.")
+        print("  evicted to %d records" % len(cache))
+        cache.close()
+
+
+def replay_result(moves):
+    """Replay moves of a game record and return black's margin."""
+    player, opponent = BitBoard.INIT_BLACK, BitBoard.INIT_WHITE
+    for move in moves:
+        if move == OthelloGame.PASS:
+            if core.moves(player, opponent):
+                raise AssertionError("A pass was recorded with a move.")
+        else:
+            if not core.is_reversible(player, opponent, move):
+                raise AssertionError("An illegal move was recorded.")
+            reverse_bit = core.flip(player, opponent, move)
+            player, opponent = \
+                player ^ reverse_bit ^ (1 << move), opponent ^ reverse_bit
+        player, opponent = opponent, player
+    if not core.is_finished(player, opponent):
+        raise AssertionError("A game was recorded before its end.")
+    if len(moves) % 2:
+        player, opponent = opponent, player
+    return core.count(player) - core.count(opponent)
+
+
+def bench_selfplay(positions, games=400, workers=(1, 2, 4)):
+    """Self-play games per second by the number of workers."""
+    pairs = [("random", "maximize"), ("maximize", "random")]
+    print("self-play (%d games of %s, %d cpus)" % (
+        games, " vs ".join(pairs[0]), os.cpu_count()))
+    shards = None
+    for number in workers:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            selfplay.generate(
+                pairs, games, directory, number, shard_size=8 << 10)
+            elapsed = time.perf_counter() - start
+            dataset = selfplay.GameDataset(directory)
+            size = sum(
+                os.path.getsize(os.path.join(directory, name))
+                for name in os.listdir(directory))
+            for game in dataset:
+                if replay_result(game.moves) != game.black - game.white:
+                    raise AssertionError("A result was recorded wrongly.")
+            print("  %2d workers %8.1f games/s  %d shards %6.1f bytes/game"
+                  % (number, games / elapsed,
+                     len(selfplay.shard_names(directory)), size / games))
+            dataset.close()
+
+            # Games are in the order of the seeds by any workers.
+            contents = []
+            for name in selfplay.shard_names(directory):
+                with open(name, "rb") as file_:
+                    contents.append(file_.read())
+            if shards is None:
+                shards = contents
+            elif contents != shards:
+                raise AssertionError("Shards differ by the workers.")
+    print("  the same shards are written by any workers")
+
+
+def bench_record(positions, games=500):
+    """Write, read and replay game records."""
+    played = []
+    for seed in range(games):
+        moves, _ = selfplay.play_game("random", "maximize", seed)
+        black, white = list(record.replay(moves))[-1][:2]
+        played.append((moves, core.count(black), core.count(white)))
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "games.rec")
+        start = time.perf_counter()
+        with record.RecordWriter(filename) as writer:
+            for moves, black, white in played:
+                writer.write(
+                    moves, black, white, times=[0.] * len(moves))
+        elapsed = time.perf_counter() - start
+        print("game records (%d games, %.1f bytes/game)" % (
+            games, os.path.getsize(filename) / games))
+        report("  write", games / elapsed)
+
+        reader = record.RecordReader(filename)
+        start = time.perf_counter()
+        for game, (moves, black, white) in zip(reader, played):
+            if bytes(game.moves) != moves \
+                    or (game.black, game.white) != (black, white):
+                raise AssertionError("A record was read wrongly.")
+            del game
+        report("  read", games / (time.perf_counter() - start))
+        reader.close()
+
+    start = time.perf_counter()
+    for moves, _, _ in played:
+        for _ in record.replay(moves):
+            pass
+    report("  replay", games / (time.perf_counter() - start))
+    start = time.perf_counter()
+    for moves, _, _ in played:
+        text = record.to_text(moves)
+        if record.from_text(text.replace("pass", "")) != moves:
+            raise AssertionError("Text was converted wrongly.")
+    report("  text round trip", games / (time.perf_counter() - start))
+
+
+def legacy_set_match(strategy1, strategy2, color):
+    """`set_match` of matching.py, which plays by `process_game`."""
+    game = OthelloGame(color)
+    game.load_strategy(Strategy)
+    game.change_strategy(strategy1, is_player=True)
+    game.change_strategy(strategy2, is_player=False)
+    game.auto_mode(True)
+    while not game.process_game()[0]:
+        pass
+    return game.result, bytes(game.move_log)
+
+
+def legacy_matching(strategies):
+    """`matching` of matching.py, which loads the strategies every game."""
+    return [legacy_set_match(*strategies, color)[0]
+            for color in ("black", "white")]
+
+
+def bench_pool(positions, repeat=4, workers=2):
+    """Games per second of `MatchPool` and of `runMP` of matching.py."""
+    for names in (
+            ["random", "maximize", "minimize"],
+            ["random", "maximize", "minimize", "min-max short"]):
+        pairs = list(combinations(names, 2)) * repeat * (
+            1 if "min-max short" in names else 10)
+        games = [
+            (number, black, white, number)
+            for number, (black, white) in enumerate(
+                (pair[color], pair[color ^ 1])
+                for pair in pairs for color in (0, 1))
+        ]
+        print("match pool (%d games of %s, %d workers, %d cpus)" % (
+            len(games), ", ".join(names), workers, os.cpu_count()))
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(legacy_matching, pairs):
+                pass
+        baseline = len(games) / (time.perf_counter() - start)
+        report("  runMP", baseline)
+
+        for chunk_size in (1, 8):
+            start = time.perf_counter()
+            with MatchPool(names, workers, chunk_size) as pool:
+                numbers = sorted(
+                    result[0] for result in pool.play(games))
+            report("  pool [chunk %d]" % chunk_size,
+                   len(games) / (time.perf_counter() - start), baseline)
+            if numbers != list(range(len(games))):
+                raise AssertionError("A game was lost.")
+
+        # Without the start of the processes, as in a long tournament. The
+        # play stopped early must not leave its results to the next one.
+        with MatchPool(names, workers) as pool:
+            warm_up = [(number, black, white, seed + len(games))
+                       for number, black, white, seed in games]
+            for _ in zip(range(workers), pool.play(warm_up)):
+                pass
+            start = time.perf_counter()
+            results = list(pool.play(games))
+            report("  pool [warm]",
+                   len(games) / (time.perf_counter() - start), baseline)
+        if sorted(result[0] for result in results) \
+                != list(range(len(games))):
+            raise AssertionError("Results of a stopped play were received.")
+        for number, moves, margin in results:
+            if replay_result(moves) != margin:
+                raise AssertionError("A result was sent wrongly.")
+
+
+def process_game_loop(game):
+    """Play a game by `process_game` as the display does, without it."""
+    game.auto_mode(True)
+    while not game.process_game()[0]:
+        pass
+    return game.result, bytes(game.move_log)
+
+
+def bench_headless(positions, games=200):
+    """Games per second of `play_headless` and of the `process_game` loop.
+
+    Games are played with the strategies loaded for each game, as
+    `set_match` does, and with the strategies loaded beforehand, which
+    leaves the loop and the strategies. The overhead of `play_headless`
+    is its time out of the strategies per ply.
+    """
+    print("headless game loop (%d games per pair)" % games)
+    for pair in (
+            ("random", "random"), ("random", "maximize"),
+            ("min-max short", "random")):
+        number = games if "min-max short" not in pair else games // 4
+        cases = [(seed, ("black", "white")[seed & 1])
+                 for seed in range(number)]
+        print("  %s" % " vs ".join(pair))
+        for label, loaded in (("per game", False),
+                              ("loaded once", True)):
+            elapsed = []
+            results = []
+            for loop in (process_game_loop, OthelloGame.play_headless):
+                loader = OthelloGame()
+                strategies = [Strategy(loader, name) for name in pair]
+                start = time.perf_counter()
+                outcomes = []
+                strategy_time = 0.
+                plies = 0
+                for seed, color in cases:
+                    random.seed(seed)
+                    game = OthelloGame(color)
+                    if loaded:
+                        game.set_strategies(*strategies)
+                    else:
+                        game.load_strategy(Strategy)
+                        game.change_strategy(pair[0], is_player=True)
+                        game.change_strategy(pair[1], is_player=False)
+                    if loop is process_game_loop:
+                        outcomes.append(loop(game))
+                        continue
+                    record = loop(game, times=True)
+                    outcomes.append((game.result, bytes(record.moves)))
+                    strategy_time += sum(record.times)
+                    plies += len(record.moves)
+                elapsed.append(time.perf_counter() - start)
+                results.append(outcomes)
+            if results[0] != results[1]:
+                raise AssertionError("Headless games differ from set_match.")
+            report("    process_game, %s" % label, number / elapsed[0])
+            report("    play_headless, %s" % label, number / elapsed[1],
+                   number / elapsed[0])
+            if loaded:
+                print("    play_headless overhead %.1f us per ply, "
+                      "strategies %.0f%% of the time" % (
+                          1e6 * (elapsed[1] - strategy_time) / plies,
+                          100 * strategy_time / elapsed[1]))
+
+
+class ZeroNoise(np.random.RandomState):
+    """Random state whose samples are 0, so ties go to the first square."""
+
+    def random_sample(self, size=None):
+        return np.zeros(size)
+
+
+def first_choice(candidates):
+    """`random.choice` which takes the first, i.e. the lowest square."""
+    return candidates[0]
+
+
+def bench_lockstep(positions, games=400):
+    """Check lockstep games against `play_headless` and time them both.
+
+    Without noise, both take the lowest square of ties, so every game must
+    be replayed exactly. With noise, the rates of the results must agree
+    within the sampling error.
+    """
+    print("lockstep (%d games per pair)" % games)
+    colors = [0, 1] * (games // 2)
+    for pair in (
+            ("random", "random"), ("maximize", "random"),
+            ("minimize", "maximize")):
+        results, moves = play_lockstep(*pair, [0, 1], ZeroNoise(), True)
+        choice = random.choice
+        random.choice = first_choice
+        try:
+            for color, result, game in zip((0, 1), results, moves):
+                outcome = play_match(*pair, ("black", "white")[color])
+                if (result, game) != (outcome[0], bytes(outcome[1].moves)):
+                    raise AssertionError(
+                        "Lockstep game differs from play_headless.")
+        finally:
+            random.choice = choice
+
+        start = time.perf_counter()
+        batched = play_lockstep(*pair, colors, np.random.RandomState(0))
+        elapsed = [time.perf_counter() - start]
+        start = time.perf_counter()
+        scalar = [
+            play_match(*pair, ("black", "white")[color], seed)[0]
+            for seed, color in enumerate(colors)]
+        elapsed.append(time.perf_counter() - start)
+        print("  %s" % " vs ".join(pair))
+        for label, outcomes, seconds in (
+                ("play_headless", scalar, elapsed[1]),
+                ("lockstep", batched, elapsed[0])):
+            print("    %-14s %6.3f s  win %.3f draw %.3f" % (
+                label, seconds, outcomes.count("WIN") / games,
+                outcomes.count("DRAW") / games))
+        for label in ("WIN", "DRAW", "LOSE"):
+            rates = [outcomes.count(label) / games
+                     for outcomes in (scalar, batched)]
+            mean = sum(rates) / 2
+            error = (2 * mean * (1 - mean) / games) ** 0.5
+            if abs(rates[0] - rates[1]) > 4 * error + 1e-9:
+                raise AssertionError(
+                    "Lockstep %s rate %.3f differs from %.3f." % (
+                        label, rates[1], rates[0]))
+
+
+SECTIONS = {
+    "flip": bench_flip,
+    "backend": bench_backend,
+    "batch": bench_batch,
+    "zobrist": bench_zobrist,
+    "table": bench_table,
+    "symmetry": bench_symmetry,
+    "endgame": bench_endgame,
+    "deepening": bench_deepening,
+    "negamax": bench_negamax,
+    "ordering": bench_ordering,
+    "evaluation": bench_evaluation,
+    "incremental": bench_incremental,
+    "pattern": bench_pattern,
+    "features": bench_features,
+    "parallel": bench_parallel,
+    "shared": bench_shared,
+    "book": bench_book,
+    "cache": bench_cache,
+    "selfplay": bench_selfplay,
+    "record": bench_record,
+    "pool": bench_pool,
+    "headless": bench_headless,
+    "lockstep": bench_lockstep,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "sections", nargs="*", help=", ".join(SECTIONS))
+    parser.add_argument("--games", type=int, default=200)
+    args = parser.parse_args()
+    for section in args.sections:
+        if section not in SECTIONS:
+            parser.error("unknown section: %s" % section)
+
+    positions = sample_positions(args.games)
+    for section in args.sections or SECTIONS:
+        SECTIONS[section](positions)
@@ -1,3 +1,4 @@
 from .bitothello import OthelloGame
+from .flip import get_backend, set_backend
 
-__all__ = ["OthelloGame"]
+__all__ = ["OthelloGame", "get_backend", "set_backend"]
@@ -0,0 +1,130 @@
+"""
+This file defines the batch version of the core of Reversi.
+Boards are numpy arrays of uint64 in (player, opponent) terms, and each
+function processes every position at once with the same shift/mask
+recurrences as `core.moves`.
+"""
+
+import numpy as np
+
+__all__ = ["moves", "flip", "count", "bits"]
+
+_HORIZ = np.uint64(0x7e7e7e7e7e7e7e7e)
+_VERT = np.uint64(0x00ffffffffffff00)
+_ALL_BORDER = np.uint64(0x007e7e7e7e7e7e00)
+_ZERO = np.uint64(0)
+_ONE = np.uint64(1)
+_SQUARES = np.arange(64, dtype=np.uint64)
+
+# (mask of opponent, shift) of the eight directions.
+_DIRECTIONS = [
+    (_HORIZ, np.uint64(1)),
+    (_VERT, np.uint64(8)),
+    (_ALL_BORDER, np.uint64(7)),
+    (_ALL_BORDER, np.uint64(9)),
+]
+
+
+def _as_board(board):
+    return np.asarray(board, dtype=np.uint64)
+
+
+def moves(player, opponent):
+    """Returns reversible areas of player.
+
+    Parameters
+    ----------
+    player, opponent : numpy.ndarray of uint64
+        Player's and opponent's disks.
+
+    Returns
+    -------
+    reversible : numpy.ndarray of uint64
+    """
+    player = _as_board(player)
+    opponent = _as_board(opponent)
+    blank_board = ~(player | opponent)
+
+    reversible = np.zeros_like(player)
+    for mask, shift in _DIRECTIONS:
+        masked = opponent & mask
+
+        one_rv = masked & (player << shift)
+        one_rv |= masked & (one_rv << shift)
+        one_rv |= masked & (one_rv << shift)
+        one_rv |= masked & (one_rv << shift)
+        one_rv |= masked & (one_rv << shift)
+        one_rv |= masked & (one_rv << shift)
+        reversible |= blank_board & (one_rv << shift)
+
+        one_rv = masked & (player >> shift)
+        one_rv |= masked & (one_rv >> shift)
+        one_rv |= masked & (one_rv >> shift)
+        one_rv |= masked & (one_rv >> shift)
+        one_rv |= masked & (one_rv >> shift)
+        one_rv |= masked & (one_rv >> shift)
+        reversible |= blank_board & (one_rv >> shift)
+    return reversible
+
+
+def flip(player, opponent, put_loc):
+    """Return disks reversed by putting a disk on put_loc.
+
+    Parameters
+    ----------
+    player, opponent : numpy.ndarray of uint64
+        Player's and opponent's disks.
+    put_loc : numpy.ndarray of int
+        Integers from 0 to 63.
+
+    Returns
+    -------
+    reverse_bit : numpy.ndarray of uint64
+    """
+    player = _as_board(player)
+    opponent = _as_board(opponent)
+    put_bit = _ONE << np.asarray(put_loc, dtype=np.uint64)
+
+    reverse_bit = np.zeros_like(player)
+    for mask, shift in _DIRECTIONS:
+        masked = opponent & mask
+
+        line = masked & (put_bit << shift)
+        line |= masked & (line << shift)
+        line |= masked & (line << shift)
+        line |= masked & (line << shift)
+        line |= masked & (line << shift)
+        line |= masked & (line << shift)
+        reverse_bit |= np.where(
+            (line << shift) & player != _ZERO, line, _ZERO)
+
+        line = masked & (put_bit >> shift)
+        line |= masked & (line >> shift)
+        line |= masked & (line >> shift)
+        line |= masked & (line >> shift)
+        line |= masked & (line >> shift)
+        line |= masked & (line >> shift)
+        reverse_bit |= np.where(
+            (line >> shift) & player != _ZERO, line, _ZERO)
+    return reverse_bit
+
+
+if hasattr(np, "bitwise_count"):
+    def count(x):
+        """Count the number of bit awaking of each board."""
+        return np.bitwise_count(_as_board(x)).astype(np.int64)
+else:  # numpy < 2.0
+    def count(x):
+        """Count the number of bit awaking of each board."""
+        x = _as_board(x)
+        x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+        x = (x & np.uint64(0x3333333333333333)) \
+            + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+        x = (x + (x >> np.uint64(4))) & np.uint64(0x0f0f0f0f0f0f0f0f)
+        x = (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+        return x.astype(np.int64)
+
+
+def bits(x):
+    """Return a (number of boards, 64) bool array of the awaking bits."""
+    return ((_as_board(x)[:, None] >> _SQUARES) & _ONE).astype(bool)
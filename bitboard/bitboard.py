@@ -6,6 +6,8 @@ Black disk make the first move, and white disk make the second move.
 # from functools import lru_cache
 from logging import getLogger
 
+from .core import count, flip, is_reversible, moves
+
 logger = getLogger(__name__)
 
 
@@ -97,28 +99,19 @@ class BitBoard:
 
         Returns
         -------
-        reversed_black_board, reversed_white_board : list of int
+        reversed_black_board, reversed_white_board : tuple of int
         """
         if black_board is None:
             black_board = self._black_board
             white_board = self._white_board
-        board = [black_board, white_board]
-
-        # Player is board[turn].
-        reverse_bit = 0
-        for direction in range(8):
-            reverse_bit_ = 0
-            border_bit = self._check_surround(put_loc, direction)
-            while border_bit & board[turn ^ 1]:
-                reverse_bit_ |= border_bit
-                border_bit = self._check_surround(border_bit, direction)
-            # If player's disk is opposite side.
-            if border_bit & board[turn]:
-                reverse_bit |= reverse_bit_
-        board[turn] ^= (put_loc | reverse_bit)
-        board[turn ^ 1] ^= reverse_bit
-
-        return board
+        if turn:
+            reverse_bit = flip(
+                white_board, black_board, put_loc.bit_length() - 1)
+            return black_board ^ reverse_bit, \
+                white_board ^ (put_loc | reverse_bit)
+        reverse_bit = flip(black_board, white_board, put_loc.bit_length() - 1)
+        return black_board ^ (put_loc | reverse_bit), \
+            white_board ^ reverse_bit
 
     def update_board(self, black_board, white_board):
         """Put a disk and reverse opponent disks.
@@ -142,8 +135,7 @@ class BitBoard:
         if black_board is None:
             black_board = self._black_board
             white_board = self._white_board
-        board = [black_board, white_board]
-        return list(map(self._bit_count, board))
+        return [count(black_board), count(white_board)]
 
     def reversible_area(
             self, turn: int, black_board: int = None, white_board: int = None):
@@ -164,85 +156,9 @@ class BitBoard:
         if black_board is None:
             black_board = self._black_board
             white_board = self._white_board
-        board = [black_board, white_board]
-        blank_board = ~(board[0] | board[1])
-
-        horiz_brd = board[turn ^ 1] & 0x7e7e7e7e7e7e7e7e
-        vert_brd = board[turn ^ 1] & 0x00ffffffffffff00
-        all_border = board[turn ^ 1] & 0x007e7e7e7e7e7e00
-
-        # Upper
-        one_rv = horiz_brd & (board[turn] << 1)
-        one_rv |= horiz_brd & (one_rv << 1)
-        one_rv |= horiz_brd & (one_rv << 1)
-        one_rv |= horiz_brd & (one_rv << 1)
-        one_rv |= horiz_brd & (one_rv << 1)
-        one_rv |= horiz_brd & (one_rv << 1)
-        reversible = blank_board & (one_rv << 1)
-
-        # Lower
-        one_rv = horiz_brd & (board[turn] >> 1)
-        one_rv |= horiz_brd & (one_rv >> 1)
-        one_rv |= horiz_brd & (one_rv >> 1)
-        one_rv |= horiz_brd & (one_rv >> 1)
-        one_rv |= horiz_brd & (one_rv >> 1)
-        one_rv |= horiz_brd & (one_rv >> 1)
-        reversible |= blank_board & (one_rv >> 1)
-
-        # Left
-        one_rv = vert_brd & (board[turn] << 8)
-        one_rv |= vert_brd & (one_rv << 8)
-        one_rv |= vert_brd & (one_rv << 8)
-        one_rv |= vert_brd & (one_rv << 8)
-        one_rv |= vert_brd & (one_rv << 8)
-        one_rv |= vert_brd & (one_rv << 8)
-        reversible |= blank_board & (one_rv << 8)
-
-        # Right
-        one_rv = vert_brd & (board[turn] >> 8)
-        one_rv |= vert_brd & (one_rv >> 8)
-        one_rv |= vert_brd & (one_rv >> 8)
-        one_rv |= vert_brd & (one_rv >> 8)
-        one_rv |= vert_brd & (one_rv >> 8)
-        one_rv |= vert_brd & (one_rv >> 8)
-        reversible |= blank_board & (one_rv >> 8)
-
-        # Upper right
-        one_rv = all_border & (board[turn] << 7)
-        one_rv |= all_border & (one_rv << 7)
-        one_rv |= all_border & (one_rv << 7)
-        one_rv |= all_border & (one_rv << 7)
-        one_rv |= all_border & (one_rv << 7)
-        one_rv |= all_border & (one_rv << 7)
-        reversible |= blank_board & (one_rv << 7)
-
-        # Upper left
-        one_rv = all_border & (board[turn] << 9)
-        one_rv |= all_border & (one_rv << 9)
-        one_rv |= all_border & (one_rv << 9)
-        one_rv |= all_border & (one_rv << 9)
-        one_rv |= all_border & (one_rv << 9)
-        one_rv |= all_border & (one_rv << 9)
-        reversible |= blank_board & (one_rv << 9)
-
-        # Lower right
-        one_rv = all_border & (board[turn] >> 9)
-        one_rv |= all_border & (one_rv >> 9)
-        one_rv |= all_border & (one_rv >> 9)
-        one_rv |= all_border & (one_rv >> 9)
-        one_rv |= all_border & (one_rv >> 9)
-        one_rv |= all_border & (one_rv >> 9)
-        reversible |= blank_board & (one_rv >> 9)
-
-        # Lower left
-        one_rv = all_border & (board[turn] >> 7)
-        one_rv |= all_border & (one_rv >> 7)
-        one_rv |= all_border & (one_rv >> 7)
-        one_rv |= all_border & (one_rv >> 7)
-        one_rv |= all_border & (one_rv >> 7)
-        one_rv |= all_border & (one_rv >> 7)
-        reversible |= blank_board & (one_rv >> 7)
-        return reversible
+        if turn:
+            return moves(white_board, black_board)
+        return moves(black_board, white_board)
 
     def is_reversible(
             self, turn: int, put_loc: int,
@@ -266,8 +182,11 @@ class BitBoard:
         if black_board is None:
             black_board = self._black_board
             white_board = self._white_board
-        reversible = self.reversible_area(turn, black_board, white_board)
-        return (put_loc & reversible) == put_loc
+        if turn:
+            return is_reversible(
+                white_board, black_board, put_loc.bit_length() - 1)
+        return is_reversible(
+            black_board, white_board, put_loc.bit_length() - 1)
 
     def turn_playable(
             self, turn: int, black_board: int = None, white_board: int = None,
@@ -286,15 +205,15 @@ class BitBoard:
         if black_board is None:
             black_board = self._black_board
             white_board = self._white_board
-        reversible = self.reversible_area(turn, black_board, white_board)
-        return reversible != 0
+        return self.reversible_area(turn, black_board, white_board) != 0
 
     def return_board(self):
         return self._black_board, self._white_board
 
     def return_player_board(self, turn: int):
-        board = [self._black_board, self._white_board]
-        return board[turn], board[turn ^ 1]
+        if turn:
+            return self._white_board, self._black_board
+        return self._black_board, self._white_board
 
     def load_board(self, black_board, white_board):
         self._black_board = black_board
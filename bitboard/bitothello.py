@@ -4,8 +4,11 @@ import copy
 from collections import deque
 from logging import getLogger
 import random
+import time
 
 from .bitboard import BitBoard
+from .core import PASS, count, flip, is_finished, is_reversible, moves
+from .record import GameRecord
 
 logger = getLogger(__name__)
 
@@ -14,6 +17,7 @@ class OthelloGame:
 
     BLACK = BitBoard().BLACK
     WHITE = BitBoard().WHITE
+    PASS = PASS
 
     def __init__(self, player_clr="black"):
         # Set a board.
@@ -45,6 +49,9 @@ class OthelloGame:
         # Logger.
         self._board_log = deque([])
         self._board_back = deque([])
+        # Squares put by both sides in order, and PASS for passes. Boards of
+        # the logs above come with the moves to them, to keep it in sync.
+        self.move_log = []
 
     def play_turn(self, put_loc: int):
         """You can put disk and reverse opponent's disk.
@@ -56,19 +63,27 @@ class OthelloGame:
         """
         if not (0 <= put_loc <= 63):
             raise AssertionError
-        put_loc = pow(2, put_loc)
+        player, opponent = self.board.return_player_board(self.turn)
 
         # If input value is not valid, raise an error.
-        if not self.board.is_reversible(self.turn, put_loc):
+        if not is_reversible(player, opponent, put_loc):
             raise ValueError
 
-        next_board = self.board.simulate_play(self.turn, put_loc)
+        reverse_bit = flip(player, opponent, put_loc)
+        player ^= reverse_bit | (1 << put_loc)
+        opponent ^= reverse_bit
+        if self.turn:
+            next_board = (opponent, player)
+        else:
+            next_board = (player, opponent)
 
+        self.move_log.append(put_loc)
         if self._player_clr == self.turn:
             # Delete roll back log which is no longer used.
             if self._board_back:
                 self._board_back = deque([])
-            self._board_log.append(next_board)
+            # The number of moves to the board is kept with it.
+            self._board_log.append((*next_board, len(self.move_log)))
 
         # Update boards.
         self.board.update_board(*next_board)
@@ -77,11 +92,8 @@ class OthelloGame:
 
     def update_count(self):
         """Update counts of disks."""
-        count_board = self.board.count_disks()
-        player_cpu = [
-            count_board[self._player_clr],
-            count_board[self._player_clr ^ 1],
-        ]
+        player, cpu = self.board.return_player_board(self._player_clr)
+        player_cpu = [count(player), count(cpu)]
         self._disk_count = player_cpu
         return player_cpu
 
@@ -91,9 +103,7 @@ class OthelloGame:
             disk_count = self._disk_count
 
         # if self._pass_cnt >= 2 or sum(disk_count) == 64:
-        black = self.board.reversible_area(0)
-        white = self.board.reversible_area(1)
-        if (black == 0 and white == 0) or sum(disk_count) == 64:
+        if sum(disk_count) == 64 or is_finished(*self.board.return_board()):
             if disk_count[0] == disk_count[1]:
                 self.result = "DRAW"
             if disk_count[0] > disk_count[1]:
@@ -112,7 +122,20 @@ class OthelloGame:
         self._strategy_player = Strategy(self)
         self._strategy_opponent = Strategy(self)
 
-    def change_strategy(self, strategy, is_player=False):
+    def set_strategies(self, player, opponent):
+        """Set strategy instances loaded beforehand, to reuse them.
+
+        Parameters
+        ----------
+        player, opponent : Strategy
+            Instances which have `selecter`, e.g. of another game.
+        """
+        self._strategy_player = player
+        self._strategy_opponent = opponent
+
+    def change_strategy(
+            self, strategy, is_player=False, time_limit=None, workers=None,
+            ):
         """You can select AI strategy from candidates below.
 
         Parameters
@@ -123,11 +146,16 @@ class OthelloGame:
             minimize : Put disk to minimize number of one's disks.
         is_player : bool
             Default is False.
+        time_limit : float (optional)
+            Seconds per move of the min-max strategies.
+        workers : int (optional)
+            Number of processes of the parallel strategies.
         """
         if is_player:
-            self._strategy_player.set_strategy(strategy)
+            self._strategy_player.set_strategy(strategy, time_limit, workers)
         else:
-            self._strategy_opponent.set_strategy(strategy)
+            self._strategy_opponent.set_strategy(
+                strategy, time_limit, workers)
 
     def process_game(self):
         """
@@ -141,9 +169,9 @@ class OthelloGame:
             logger.debug("Game was judged as the end.")
             return True, True
 
+        self.reversible = moves(*self.board.return_player_board(self.turn))
         if self.turn == self._player_clr:
-            self.reversible = self.board.reversible_area(self.turn)
-            if self.board.turn_playable(self.turn):
+            if self.reversible:
                 if self._player_auto:
                     logger.debug("Player's turn was processed automatically.")
                     self.play_turn(self._strategy_player.selecter(self))
@@ -152,20 +180,82 @@ class OthelloGame:
                     pass
             else:
                 logger.debug("Player's turn was passed.")
+                self.move_log.append(OthelloGame.PASS)
                 self.turn ^= 1
                 self._pass_cnt[self.turn] += 1
         else:
-            self.reversible = self.board.reversible_area(self.turn)
-            if self.board.turn_playable(self.turn):
+            if self.reversible:
                 logger.debug("CPU's turn was processed automatically.")
                 self.play_turn(self._strategy_opponent.selecter(self))
                 return False, True
             else:
                 logger.debug("CPU's turn was passed.")
+                self.move_log.append(OthelloGame.PASS)
                 self.turn ^= 1
                 self._pass_cnt[self.turn] += 1
         return False, False
 
+    def play_headless(self, times: bool = False):
+        """Play the game to the end between the strategies.
+
+        This is `process_game` in a loop without the display, which finds
+        the moves of a side once per ply and reuses them for the strategy,
+        the pass and the end of the game.
+
+        Parameters
+        ----------
+        times : bool
+            If True, seconds of each move are recorded.
+
+        Returns
+        -------
+        record : bitboard.record.GameRecord
+            Moves and disks at the end. `result` is set as `judge_game`.
+        """
+        board = self.board
+        selecters = [self._strategy_opponent.selecter] * 2
+        selecters[self._player_clr] = self._strategy_player.selecter
+        move_times = [] if times else None
+        player, opponent = board.return_player_board(self.turn)
+        reversible = moves(player, opponent)
+        while True:
+            if not reversible:
+                reversible = moves(opponent, player)
+                if not reversible:
+                    break
+                self.move_log.append(OthelloGame.PASS)
+                if times:
+                    move_times.append(0.)
+                self.turn ^= 1
+                self._pass_cnt[self.turn] += 1
+                player, opponent = opponent, player
+                continue
+
+            self.reversible = reversible
+            if times:
+                start = time.perf_counter()
+            put_loc = selecters[self.turn](self)
+            if times:
+                move_times.append(time.perf_counter() - start)
+            if not 0 <= put_loc <= 63 or not (reversible >> put_loc) & 1:
+                raise ValueError
+            reverse_bit = flip(player, opponent, put_loc)
+            player, opponent = \
+                opponent ^ reverse_bit, player ^ reverse_bit ^ (1 << put_loc)
+            if self.turn:
+                board.update_board(player, opponent)
+            else:
+                board.update_board(opponent, player)
+            self.move_log.append(put_loc)
+            self._pass_cnt[self.turn] = 0
+            self.turn ^= 1
+            reversible = moves(player, opponent)
+
+        self.update_count()
+        self.judge_game()
+        black, white = board.count_disks()
+        return GameRecord(bytes(self.move_log), black, white, None, move_times)
+
     def display_board(self):
         """Calculate 2-dimensional arrays to be used for board display."""
         black_board, white_board = self.board.return_board()
@@ -191,9 +281,12 @@ class OthelloGame:
             return False
 
         logger.info("The board was playbacked.")
-        previous_board = self._board_log.pop()
-        self._board_back.append(self.board.return_board())
-        self.board.load_board(*previous_board)
+        black_board, white_board, length = self._board_log.pop()
+        # Moves after the board are kept to be redone.
+        self._board_back.append(
+            (*self.board.return_board(), self.move_log[length:]))
+        del self.move_log[length:]
+        self.board.load_board(black_board, white_board)
 
         logger.debug(
             "Log:%s - %s" % (
@@ -212,9 +305,11 @@ class OthelloGame:
             logger.warning("The board can not be advanced.")
             return False
         logger.info("The board was advanced.")
-        next_board = self._board_back.pop()
-        self._board_log.append(self.board.return_board())
-        self.board.load_board(*next_board)
+        black_board, white_board, moves_after = self._board_back.pop()
+        self._board_log.append(
+            (*self.board.return_board(), len(self.move_log)))
+        self.move_log.extend(moves_after)
+        self.board.load_board(black_board, white_board)
         logger.debug(
             "Log:%s - %s" % (
                 ", ".join(map(str, self._board_log)),
@@ -227,9 +322,13 @@ class OthelloGame:
 
     def return_state(self):
         black_board, white_board = self.board.return_board()
-        return black_board, white_board, self._board_log, self._board_back
+        return (black_board, white_board, self._board_log, self._board_back,
+                self.move_log)
 
-    def load_state(self, black_board, white_board, board_log, board_back):
+    def load_state(
+            self, black_board, white_board, board_log, board_back, move_log,
+            ):
         self.board.load_board(black_board, white_board)
         self._board_log = copy.deepcopy(board_log)
         self._board_back = copy.deepcopy(board_back)
+        self.move_log = list(move_log)
@@ -0,0 +1,142 @@
+"""
+This file defines the stateless core of Reversi.
+Boards are plain ints in (player, opponent) terms, and no list is built,
+so that search code can call it directly.
+"""
+
+from .flip import flip, is_reversible
+
+__all__ = [
+    "moves", "flip", "is_reversible", "play", "pass_", "count",
+    "is_finished", "squares", "PASS",
+]
+
+PASS = 64  # Square number which marks a pass in move logs.
+
+try:
+    count = int.bit_count
+except AttributeError:  # Python < 3.10
+    def count(x: int):
+        """Count the number of bit awaking."""
+        return bin(x).count("1")
+
+
+def moves(player: int, opponent: int):
+    """Returns reversible area of player.
+
+    Each direction floods from player's disks through opponent's disks.
+    After two single steps, the flood takes two steps at once through
+    pairs of opponent's disks, so 4 steps cover the 6 disks of a line.
+
+    Parameters
+    ----------
+    player, opponent : int
+        64-bit intager of player's and opponent's disks.
+
+    Returns
+    -------
+    reversible : int
+        Represents board of reversible positions.
+    """
+    blank_board = ~(player | opponent) & 0xffffffffffffffff
+
+    horiz_brd = opponent & 0x7e7e7e7e7e7e7e7e
+    vert_brd = opponent & 0x00ffffffffffff00
+    all_border = opponent & 0x007e7e7e7e7e7e00
+
+    # Upper
+    pair = horiz_brd & (horiz_brd << 1)
+    one_rv = horiz_brd & (player << 1)
+    one_rv |= horiz_brd & (one_rv << 1)
+    one_rv |= pair & (one_rv << 2)
+    one_rv |= pair & (one_rv << 2)
+    reversible = one_rv << 1
+
+    # Lower
+    pair >>= 1
+    one_rv = horiz_brd & (player >> 1)
+    one_rv |= horiz_brd & (one_rv >> 1)
+    one_rv |= pair & (one_rv >> 2)
+    one_rv |= pair & (one_rv >> 2)
+    reversible |= one_rv >> 1
+
+    # Left
+    pair = vert_brd & (vert_brd << 8)
+    one_rv = vert_brd & (player << 8)
+    one_rv |= vert_brd & (one_rv << 8)
+    one_rv |= pair & (one_rv << 16)
+    one_rv |= pair & (one_rv << 16)
+    reversible |= one_rv << 8
+
+    # Right
+    pair >>= 8
+    one_rv = vert_brd & (player >> 8)
+    one_rv |= vert_brd & (one_rv >> 8)
+    one_rv |= pair & (one_rv >> 16)
+    one_rv |= pair & (one_rv >> 16)
+    reversible |= one_rv >> 8
+
+    # Upper right
+    pair = all_border & (all_border << 7)
+    one_rv = all_border & (player << 7)
+    one_rv |= all_border & (one_rv << 7)
+    one_rv |= pair & (one_rv << 14)
+    one_rv |= pair & (one_rv << 14)
+    reversible |= one_rv << 7
+
+    # Lower left
+    pair >>= 7
+    one_rv = all_border & (player >> 7)
+    one_rv |= all_border & (one_rv >> 7)
+    one_rv |= pair & (one_rv >> 14)
+    one_rv |= pair & (one_rv >> 14)
+    reversible |= one_rv >> 7
+
+    # Upper left
+    pair = all_border & (all_border << 9)
+    one_rv = all_border & (player << 9)
+    one_rv |= all_border & (one_rv << 9)
+    one_rv |= pair & (one_rv << 18)
+    one_rv |= pair & (one_rv << 18)
+    reversible |= one_rv << 9
+
+    # Lower right
+    pair >>= 9
+    one_rv = all_border & (player >> 9)
+    one_rv |= all_border & (one_rv >> 9)
+    one_rv |= pair & (one_rv >> 18)
+    one_rv |= pair & (one_rv >> 18)
+    reversible |= one_rv >> 9
+    return reversible & blank_board
+
+
+def play(player: int, opponent: int, put_loc: int):
+    """Put a disk on put_loc (0 to 63) and hand the turn to opponent.
+
+    Returns
+    -------
+    player, opponent : int
+        Boards of the next turn, that is, the opponent's board comes first.
+    """
+    reverse_bit = flip(player, opponent, put_loc)
+    return opponent ^ reverse_bit, player ^ reverse_bit ^ (1 << put_loc)
+
+
+def pass_(player: int, opponent: int):
+    """Hand the turn to opponent without putting a disk."""
+    return opponent, player
+
+
+def is_finished(player: int, opponent: int):
+    """Return wheather neither side can put a disk."""
+    return not moves(player, opponent) and not moves(opponent, player)
+
+
+def squares(x: int):
+    """Return the indices (0 to 63) of the bits of x in ascending order."""
+    indices = []
+    while x:
+        low = x & -x
+        indices.append(low.bit_length() - 1)
+        x ^= low
+    return indices
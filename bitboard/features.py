@@ -0,0 +1,188 @@
+"""
+This file defines positional features of Reversi computed on bitboards.
+    - stable : disks which can never be reversed.
+    - frontier : disks next to an empty square.
+    - potential mobility : empty squares next to opponent's disks.
+    - regions : connected areas of empty squares, for parity.
+Boards are in (player, opponent) terms as in `core`.
+"""
+
+from .core import count, moves
+
+__all__ = [
+    "neighbors", "full_lines", "stable", "frontier", "potential_mobility",
+    "regions", "features", "FEATURES",
+]
+
+_FULL = 0xffffffffffffffff
+# Boards without the 1st or the 8th column.
+_NOT_LEFT = 0xfefefefefefefefe
+_NOT_RIGHT = 0x7f7f7f7f7f7f7f7f
+_BORDER = 0xff818181818181ff
+
+
+def _diagonal_masks():
+    """Return masks of the diagonals of each direction."""
+    diagonals, anti_diagonals = [], []
+    for start in range(-7, 8):
+        diagonals.append(sum(
+            1 << (row*8 + row + start)
+            for row in range(8) if 0 <= row + start < 8))
+        anti_diagonals.append(sum(
+            1 << (row*8 + 7 + start - row)
+            for row in range(8) if 0 <= 7 + start - row < 8))
+    return diagonals, anti_diagonals
+
+
+_DIAGONALS, _ANTI_DIAGONALS = _diagonal_masks()
+
+# Names of the values returned by `features`.
+FEATURES = [
+    "mobility", "opponent_mobility",
+    "stable", "opponent_stable",
+    "frontier", "opponent_frontier",
+    "potential_mobility", "opponent_potential_mobility",
+    "odd_regions", "even_regions",
+]
+
+
+def neighbors(x: int):
+    """Return squares next to the disks in the 8 directions."""
+    horizontal = ((x << 1) & _NOT_LEFT) | ((x >> 1) & _NOT_RIGHT)
+    x |= horizontal
+    return (horizontal | (x << 8) | (x >> 8)) & _FULL
+
+
+def full_lines(occupied: int):
+    """Return squares on full lines of each direction.
+
+    Returns
+    -------
+    horizontal, vertical, diagonal, anti_diagonal : int
+        64-bit intager. Diagonals go along squares 0 and 63, and
+        anti-diagonals along squares 7 and 56.
+    """
+    horizontal = 0
+    for shift in range(0, 64, 8):
+        if (occupied >> shift) & 0xff == 0xff:
+            horizontal |= 0xff << shift
+    vertical = occupied & (occupied >> 8)
+    vertical &= vertical >> 16
+    vertical &= vertical >> 32
+    vertical = (vertical & 0xff) * 0x0101010101010101
+    diagonal = 0
+    for mask in _DIAGONALS:
+        if occupied & mask == mask:
+            diagonal |= mask
+    anti_diagonal = 0
+    for mask in _ANTI_DIAGONALS:
+        if occupied & mask == mask:
+            anti_diagonal |= mask
+    return horizontal, vertical, diagonal, anti_diagonal
+
+
+def stable(player: int, opponent: int, lines=None):
+    """Return player's disks which can never be reversed.
+
+    A disk is stable if, along each of the 4 axes, the line is full or a
+    neighbor is the wall or a stable disk of the same color. Stable disks
+    grow from the corners until nothing changes.
+
+    Parameters
+    ----------
+    player, opponent : int
+        64-bit intager of player's and opponent's disks.
+    lines : tuple of int (optional)
+        Result of `full_lines`, to share it between both colors.
+    """
+    if lines is None:
+        lines = full_lines(player | opponent)
+    horizontal, vertical, diagonal, anti_diagonal = lines
+    horizontal |= 0x8181818181818181
+    vertical |= 0xff000000000000ff
+    diagonal |= _BORDER
+    anti_diagonal |= _BORDER
+    # Disks protected along every axis by full lines or the wall.
+    stable_bit = player & horizontal & vertical & diagonal & anti_diagonal
+    if not stable_bit:
+        return 0
+    while True:
+        new_stable = player & (
+            horizontal
+            | ((stable_bit << 1) & _NOT_LEFT)
+            | ((stable_bit >> 1) & _NOT_RIGHT)
+        ) & (
+            vertical | (stable_bit << 8) | (stable_bit >> 8)
+        ) & (
+            diagonal
+            | ((stable_bit << 9) & _NOT_LEFT)
+            | ((stable_bit >> 9) & _NOT_RIGHT)
+        ) & (
+            anti_diagonal
+            | ((stable_bit << 7) & _NOT_RIGHT)
+            | ((stable_bit >> 7) & _NOT_LEFT)
+        ) & _FULL
+        if new_stable == stable_bit:
+            return stable_bit
+        stable_bit = new_stable
+
+
+def frontier(player: int, opponent: int):
+    """Return player's disks next to an empty square."""
+    return player & neighbors(~(player | opponent) & _FULL)
+
+
+def potential_mobility(player: int, opponent: int):
+    """Return empty squares next to opponent's disks."""
+    return neighbors(opponent) & ~(player | opponent) & _FULL
+
+
+def regions(player: int, opponent: int):
+    """Return the connected areas of empty squares.
+
+    Returns
+    -------
+    regions : list of int
+        64-bit intager of each area, in the order of their lowest square.
+    """
+    blank_board = ~(player | opponent) & _FULL
+    areas = []
+    while blank_board:
+        area = blank_board & -blank_board
+        while True:
+            grown = (area | neighbors(area)) & blank_board
+            if grown == area:
+                break
+            area = grown
+        areas.append(area)
+        blank_board ^= area
+    return areas
+
+
+def features(player: int, opponent: int):
+    """Return the feature vector of a position in the order of FEATURES.
+
+    Parameters
+    ----------
+    player, opponent : int
+        64-bit intager of the side to move and the other.
+
+    Returns
+    -------
+    features : list of int
+    """
+    lines = full_lines(player | opponent)
+    areas = regions(player, opponent)
+    odd = sum(count(area) & 1 for area in areas)
+    return [
+        count(moves(player, opponent)),
+        count(moves(opponent, player)),
+        count(stable(player, opponent, lines)),
+        count(stable(opponent, player, lines)),
+        count(frontier(player, opponent)),
+        count(frontier(opponent, player)),
+        count(potential_mobility(player, opponent)),
+        count(potential_mobility(opponent, player)),
+        odd,
+        len(areas) - odd,
+    ]
@@ -0,0 +1,159 @@
+"""
+This file defines the flip engines of Reversi.
+    - shift : Flips in all eight directions are computed with fixed-length
+              shift/mask sequences, like `BitBoard.reversible_area`.
+    - table : Flips are looked up in precomputed line tables.
+The engine used by `flip` can be switched at runtime by `set_backend`.
+"""
+
+from .table import flip_table
+
+
+def flip_shift(player: int, opponent: int, put_loc: int):
+    """Return disks reversed by putting a disk on put_loc.
+
+    Each direction floods from the put disk through opponent disks with a
+    parallel-prefix (Kogge-Stone) sequence of three shifts, so there is no
+    loop over the length of a line. The only test per direction is whether
+    the neighbor is an opponent disk, which skips the sequence entirely.
+
+    Parameters
+    ----------
+    player, opponent : int
+        64-bit intager of player's and opponent's disks.
+    put_loc : int
+        Integer from 0 to 63.
+
+    Returns
+    -------
+    reverse_bit : int
+        64-bit intager which represents the reversed disks.
+    """
+    put_bit = 1 << put_loc
+    horiz_brd = opponent & 0x7e7e7e7e7e7e7e7e
+    vert_brd = opponent & 0x00ffffffffffff00
+    all_border = opponent & 0x007e7e7e7e7e7e00
+    reverse_bit = 0
+
+    # Upper
+    line = vert_brd & (put_bit << 8)
+    if line:
+        line |= put_bit
+        prop = vert_brd & (vert_brd << 8)
+        line |= prop & (line << 16)
+        prop &= prop << 16
+        line |= prop & (line << 32)
+        if (line << 8) & player:
+            reverse_bit |= line
+
+    # Upper right
+    line = all_border & (put_bit << 7)
+    if line:
+        line |= put_bit
+        prop = all_border & (all_border << 7)
+        line |= prop & (line << 14)
+        prop &= prop << 14
+        line |= prop & (line << 28)
+        if (line << 7) & player:
+            reverse_bit |= line
+
+    # Right
+    line = horiz_brd & (put_bit >> 1)
+    if line:
+        line |= put_bit
+        prop = horiz_brd & (horiz_brd >> 1)
+        line |= prop & (line >> 2)
+        prop &= prop >> 2
+        line |= prop & (line >> 4)
+        if (line >> 1) & player:
+            reverse_bit |= line
+
+    # Lower right
+    line = all_border & (put_bit >> 9)
+    if line:
+        line |= put_bit
+        prop = all_border & (all_border >> 9)
+        line |= prop & (line >> 18)
+        prop &= prop >> 18
+        line |= prop & (line >> 36)
+        if (line >> 9) & player:
+            reverse_bit |= line
+
+    # Lower
+    line = vert_brd & (put_bit >> 8)
+    if line:
+        line |= put_bit
+        prop = vert_brd & (vert_brd >> 8)
+        line |= prop & (line >> 16)
+        prop &= prop >> 16
+        line |= prop & (line >> 32)
+        if (line >> 8) & player:
+            reverse_bit |= line
+
+    # Lower left
+    line = all_border & (put_bit >> 7)
+    if line:
+        line |= put_bit
+        prop = all_border & (all_border >> 7)
+        line |= prop & (line >> 14)
+        prop &= prop >> 14
+        line |= prop & (line >> 28)
+        if (line >> 7) & player:
+            reverse_bit |= line
+
+    # Left
+    line = horiz_brd & (put_bit << 1)
+    if line:
+        line |= put_bit
+        prop = horiz_brd & (horiz_brd << 1)
+        line |= prop & (line << 2)
+        prop &= prop << 2
+        line |= prop & (line << 4)
+        if (line << 1) & player:
+            reverse_bit |= line
+
+    # Upper left
+    line = all_border & (put_bit << 9)
+    if line:
+        line |= put_bit
+        prop = all_border & (all_border << 9)
+        line |= prop & (line << 18)
+        prop &= prop << 18
+        line |= prop & (line << 36)
+        if (line << 9) & player:
+            reverse_bit |= line
+
+    return reverse_bit & ~put_bit
+
+
+BACKENDS = {
+    "shift": flip_shift,
+    "table": flip_table,
+}
+_backend = "shift"
+_flip = flip_shift
+
+
+def set_backend(backend: str):
+    """Select the flip engine from "shift" and "table"."""
+    global _backend, _flip
+    if backend not in BACKENDS:
+        raise KeyError(backend)
+    _backend = backend
+    _flip = BACKENDS[backend]
+
+
+def get_backend():
+    return _backend
+
+
+def flip(player: int, opponent: int, put_loc: int):
+    """Return disks reversed by putting a disk on put_loc (0 to 63)."""
+    return _flip(player, opponent, put_loc)
+
+
+def is_reversible(player: int, opponent: int, put_loc: int):
+    """Return wheather player can put a disk on put_loc (0 to 63)."""
+    if ((player | opponent) >> put_loc) & 1:
+        return False
+    return _flip(player, opponent, put_loc) != 0
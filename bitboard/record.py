@@ -0,0 +1,261 @@
+"""
+This file defines a binary format of game records.
+A file is a magic number followed by records of games.
+    header : flags, number of moves, black's disks, white's disks (uint8)
+    moves  : square of each move (uint8), PASS for a pass
+    evals  : evaluation of each move (float32), if flags has EVALS
+    times  : seconds of each move (float32), if flags has TIMES
+Squares are written as "f5" in text, with the column from "a" and the row
+from 1, and passes as "pass".
+"""
+
+from collections import namedtuple
+import mmap
+import os
+import re
+import struct
+
+import numpy as np
+
+from .bitboard import BitBoard
+from .core import PASS, is_reversible, moves as legal_moves, pass_, play
+
+__all__ = [
+    "GameRecord", "RecordWriter", "RecordReader", "replay", "to_text",
+    "from_text", "PASS",
+]
+
+EVALS = 1
+TIMES = 2
+_MAGIC = b"RVGR\x01\x00\x00\x00"
+_HEADER = struct.Struct("<BBBB")
+
+GameRecord = namedtuple(
+    "GameRecord", ["moves", "black", "white", "evals", "times"])
+GameRecord.__doc__ = """A game of a record file.
+
+moves : bytes-like of squares, and PASS for passes
+black, white : int
+    Disks at the end of the game.
+evals, times : numpy.ndarray of float32, or None
+"""
+
+
+class RecordWriter:
+    """Append game records to a file as they are finished.
+
+    Parameters
+    ----------
+    filename : str
+        A new file is started, or records are appended to an existing one.
+    """
+
+    __all__ = ["write", "write_game", "tell", "flush", "close"]
+
+    def __init__(self, filename: str):
+        new = not os.path.exists(filename) or not os.path.getsize(filename)
+        self._file = open(filename, "ab")
+        if new:
+            self._file.write(_MAGIC)
+        self.games = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, moves, black: int, white: int, evals=None, times=None):
+        """Append a record of a game.
+
+        Parameters
+        ----------
+        moves : bytes-like or list of int
+            Squares from 0 to 63, and PASS for passes.
+        black, white : int
+            Disks at the end of the game.
+        evals, times : list of float (optional)
+            Evaluation and seconds of each move.
+        """
+        moves = bytes(moves)
+        flags = 0
+        data = [moves]
+        for flag, values in ((EVALS, evals), (TIMES, times)):
+            if values is None:
+                continue
+            if len(values) != len(moves):
+                raise ValueError("%d values for %d moves." % (
+                    len(values), len(moves)))
+            flags |= flag
+            data.append(np.asarray(values, dtype="<f4").tobytes())
+        self._file.write(_HEADER.pack(flags, len(moves), black, white))
+        self._file.write(b"".join(data))
+        self.games += 1
+
+    def write_game(self, othello, evals=None, times=None):
+        """Append a record of an `OthelloGame` by its move log."""
+        black_board, white_board = othello.board.return_board()
+        black, white = othello.board.count_disks(black_board, white_board)
+        self.write(othello.move_log, black, white, evals, times)
+
+    def tell(self):
+        """Return the bytes of the file, including the records buffered."""
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class RecordReader:
+    """Read game records of a file without copying them.
+
+    The file is mapped, and moves, evals and times of a record are views
+    of the map, which must be released before `close`.
+
+    Parameters
+    ----------
+    filename : str
+        File written by `RecordWriter`.
+    """
+
+    __all__ = ["close"]
+
+    def __init__(self, filename: str):
+        with open(filename, "rb") as file_:
+            self._map = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(_MAGIC)] != _MAGIC:
+            self._map.close()
+            raise ValueError("%s is not a file of game records." % filename)
+        self._view = memoryview(self._map)
+        self._offsets = None
+
+    def _index(self):
+        """Return the offsets of the records, which are found once."""
+        if self._offsets is None:
+            offsets = []
+            offset = len(_MAGIC)
+            while offset + _HEADER.size <= len(self._map):
+                flags, number, _, _ = _HEADER.unpack_from(self._map, offset)
+                if flags & ~(EVALS | TIMES):
+                    raise ValueError("Broken record at %d." % offset)
+                offsets.append(offset)
+                offset += _HEADER.size + number * (
+                    1 + 4 * bool(flags & EVALS) + 4 * bool(flags & TIMES))
+            if offset > len(self._map):
+                # The last record was cut while it was written.
+                offsets.pop()
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return len(self._index())
+
+    def __getitem__(self, number: int):
+        offset = self._index()[number]
+        flags, length, black, white = _HEADER.unpack_from(self._map, offset)
+        offset += _HEADER.size
+        moves = self._view[offset:offset + length]
+        offset += length
+        values = []
+        for flag in (EVALS, TIMES):
+            if flags & flag:
+                values.append(np.frombuffer(
+                    self._map, dtype="<f4", count=length, offset=offset))
+                offset += 4 * length
+            else:
+                values.append(None)
+        return GameRecord(moves, black, white, *values)
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+
+
+def _advance(player: int, opponent: int, move: int):
+    """Return the boards of the next turn, checking the move."""
+    if move == PASS:
+        if legal_moves(player, opponent):
+            raise ValueError("Pass with a legal move.")
+        return pass_(player, opponent)
+    if not 0 <= move < 64 or not is_reversible(player, opponent, move):
+        raise ValueError("Illegal move %d." % move)
+    return play(player, opponent, move)
+
+
+def replay(moves, black_board=BitBoard.INIT_BLACK,
+           white_board=BitBoard.INIT_WHITE):
+    """Yield the positions of a game.
+
+    Parameters
+    ----------
+    moves : bytes-like or list of int
+        Squares from 0 to 63, and PASS for passes. Black moves first.
+
+    Yields
+    ------
+    black_board, white_board : int
+        64-bit intager before the move, and after the last move.
+    turn : int
+        Black is 0 and white is 1.
+    move : int or None
+        Move from the position, or None at the end.
+
+    Raises
+    ------
+    ValueError
+        If a move is illegal.
+    """
+    player, opponent = black_board, white_board
+    turn = 0
+    for move in moves:
+        if turn:
+            yield opponent, player, turn, move
+        else:
+            yield player, opponent, turn, move
+        player, opponent = _advance(player, opponent, move)
+        turn ^= 1
+    if turn:
+        yield opponent, player, turn, None
+    else:
+        yield player, opponent, turn, None
+
+
+def to_text(moves, separator: str = " "):
+    """Return moves as text such as "f5 d6 c3 pass"."""
+    return separator.join(
+        "pass" if move == PASS else "abcdefgh"[move % 8] + str(move // 8 + 1)
+        for move in moves)
+
+
+def from_text(text: str):
+    """Return moves of text written by `to_text` or without separators.
+
+    Passes may be omitted, and they are found by replaying the moves.
+
+    Returns
+    -------
+    moves : bytes
+    """
+    squares = []
+    for token in re.findall(r"pass|pa|--|[a-h][1-8]", text.lower()):
+        if token[0] in "abcdefgh":
+            squares.append((int(token[1]) - 1) * 8 + "abcdefgh".index(
+                token[0]))
+        else:
+            squares.append(PASS)
+    moves = []
+    player, opponent = BitBoard.INIT_BLACK, BitBoard.INIT_WHITE
+    for square in squares:
+        if square != PASS and not legal_moves(player, opponent):
+            moves.append(PASS)
+            player, opponent = pass_(player, opponent)
+        moves.append(square)
+        player, opponent = _advance(player, opponent, square)
+    return bytes(moves)
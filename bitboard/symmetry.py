@@ -0,0 +1,135 @@
+"""
+This file defines the 8 symmetries (rotations and reflections) of a board.
+    0 : identity
+    1 : rotation by 90 degrees
+    2 : rotation by 180 degrees
+    3 : rotation by 270 degrees
+    4 : vertical flip (rows are reversed)
+    5 : horizontal mirror (columns are reversed)
+    6 : transpose along the diagonal of squares 0 and 63
+    7 : transpose along the diagonal of squares 7 and 56
+"""
+
+__all__ = [
+    "flip_vertical", "mirror_horizontal", "flip_diagonal",
+    "flip_anti_diagonal", "transform", "canonical",
+    "transform_square", "restore_square",
+]
+
+# INVERSE[symmetry] undoes the symmetry.
+INVERSE = [0, 3, 2, 1, 4, 5, 6, 7]
+
+
+def flip_vertical(x: int):
+    """Reverse the order of rows."""
+    x = ((x >> 8) & 0x00ff00ff00ff00ff) | ((x & 0x00ff00ff00ff00ff) << 8)
+    x = ((x >> 16) & 0x0000ffff0000ffff) | ((x & 0x0000ffff0000ffff) << 16)
+    return (x >> 32) | ((x & 0x00000000ffffffff) << 32)
+
+
+def mirror_horizontal(x: int):
+    """Reverse the order of columns."""
+    x = ((x >> 1) & 0x5555555555555555) | ((x & 0x5555555555555555) << 1)
+    x = ((x >> 2) & 0x3333333333333333) | ((x & 0x3333333333333333) << 2)
+    return ((x >> 4) & 0x0f0f0f0f0f0f0f0f) | ((x & 0x0f0f0f0f0f0f0f0f) << 4)
+
+
+def flip_diagonal(x: int):
+    """Transpose along the diagonal of squares 0 and 63."""
+    t = 0x0f0f0f0f00000000 & (x ^ (x << 28))
+    x ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (x ^ (x << 14))
+    x ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (x ^ (x << 7))
+    return x ^ t ^ (t >> 7)
+
+
+def flip_anti_diagonal(x: int):
+    """Transpose along the diagonal of squares 7 and 56."""
+    t = x ^ (x << 36)
+    x ^= 0xf0f0f0f00f0f0f0f & (t ^ (x >> 36))
+    t = 0xcccc0000cccc0000 & (x ^ (x << 18))
+    x ^= t ^ (t >> 18)
+    t = 0xaa00aa00aa00aa00 & (x ^ (x << 9))
+    return x ^ t ^ (t >> 9)
+
+
+def transform(x: int, symmetry: int):
+    """Apply one of the 8 symmetries to a board.
+
+    Parameters
+    ----------
+    x : int
+        64-bit intager.
+    symmetry : int
+        Integer from 0 to 7.
+    """
+    if symmetry == 0:
+        return x
+    elif symmetry == 1:
+        return flip_vertical(flip_diagonal(x))
+    elif symmetry == 2:
+        return flip_vertical(mirror_horizontal(x))
+    elif symmetry == 3:
+        return flip_diagonal(flip_vertical(x))
+    elif symmetry == 4:
+        return flip_vertical(x)
+    elif symmetry == 5:
+        return mirror_horizontal(x)
+    elif symmetry == 6:
+        return flip_diagonal(x)
+    elif symmetry == 7:
+        return flip_anti_diagonal(x)
+    else:
+        raise ValueError
+
+
+def canonical(player: int, opponent: int):
+    """Return the minimal representative of the symmetric positions.
+
+    Parameters
+    ----------
+    player, opponent : int
+        64-bit intager of player's and opponent's disks.
+
+    Returns
+    -------
+    player, opponent : int
+        The smallest (player, opponent) among the 8 symmetric positions.
+    symmetry : int
+        Symmetry which maps the position to the representative.
+        A move of the representative is mapped back by `restore_square`.
+    """
+    best = (player, opponent, 0)
+    # Each position is derived from the previous one by a single flip.
+    vertical = (flip_vertical(player), flip_vertical(opponent))
+    horizontal = (mirror_horizontal(player), mirror_horizontal(opponent))
+    rotated = (flip_vertical(horizontal[0]), flip_vertical(horizontal[1]))
+    diagonal = (flip_diagonal(player), flip_diagonal(opponent))
+    for symmetry, (sym_player, sym_opponent) in (
+            (4, vertical), (5, horizontal), (2, rotated), (6, diagonal),
+            (1, (flip_vertical(diagonal[0]), flip_vertical(diagonal[1]))),
+            (3, (flip_diagonal(vertical[0]), flip_diagonal(vertical[1]))),
+            (7, (flip_anti_diagonal(player), flip_anti_diagonal(opponent))),
+            ):
+        if (sym_player, sym_opponent) < best[:2]:
+            best = (sym_player, sym_opponent, symmetry)
+    return best
+
+
+# SQUARE_TRANSFORM[symmetry][square]
+SQUARE_TRANSFORM = [
+    [transform(1 << square, symmetry).bit_length() - 1
+     for square in range(64)]
+    for symmetry in range(8)
+]
+
+
+def transform_square(put_loc: int, symmetry: int):
+    """Map a square (0 to 63) by the symmetry."""
+    return SQUARE_TRANSFORM[symmetry][put_loc]
+
+
+def restore_square(put_loc: int, symmetry: int):
+    """Map a square (0 to 63) back by the inverse of the symmetry."""
+    return SQUARE_TRANSFORM[INVERSE[symmetry]][put_loc]
@@ -0,0 +1,169 @@
+"""
+This file defines the table-driven flip engine of Reversi.
+Every square lies on four lines (row, column and two diagonals). A line is
+gathered into 8 bits by a mask and a multiplication, the reversed disks of
+the line are looked up, and they are scattered back to the board.
+"""
+
+from logging import getLogger
+import os
+
+logger = getLogger(__name__)
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), "flip_table.bin")
+_MAGIC = b"RVFT\x01"
+_TABLE_SIZE = 8 << 16
+
+
+def _lines():
+    """Return squares of all lines ordered along the line."""
+    lines = []
+    for row in range(8):
+        lines.append([row*8 + column for column in range(8)])
+    for column in range(8):
+        lines.append([row*8 + column for row in range(8)])
+    for start in range(-7, 8):
+        # Diagonals where column - row == start.
+        lines.append([
+            row*8 + row + start for row in range(8) if 0 <= row + start < 8])
+    for start in range(15):
+        # Diagonals where column + row == start.
+        lines.append([
+            row*8 + start - row for row in range(8) if 0 <= start - row < 8])
+    return [line for line in lines if len(line) > 2]
+
+
+def _line_multiplier(line):
+    """Return a multiplier which gathers the line into the highest 8 bits.
+
+    Rows are moved up by a power of 2. Columns and diagonals have one disk
+    per row (or per column), so every disk lands on a distinct bit of the
+    highest byte without carries.
+    """
+    rows = {square // 8 for square in line}
+    columns = {square % 8 for square in line}
+    if len(rows) == 1:
+        return 1 << (56 - 8*rows.pop())
+    if len(columns) == 1:
+        return 0x0102040810204080 >> columns.pop()
+    return 0x0101010101010101
+
+
+def _gather(board, mask, multiplier):
+    return (((board & mask) * multiplier) >> 56) & 0xff
+
+
+def _line_flip(position, player, opponent):
+    """Return reversed bits of an 8-bit line by walking both directions."""
+    reverse_bit = 0
+    for step in (1, -1):
+        line = 0
+        index = position + step
+        while 0 <= index < 8 and (opponent >> index) & 1:
+            line |= 1 << index
+            index += step
+        if 0 <= index < 8 and (player >> index) & 1:
+            reverse_bit |= line
+    return reverse_bit
+
+
+def build_flip_table():
+    """Build reversed bits for every (position, opponent, player) of a line.
+
+    The index is position << 16 | opponent << 8 | player.
+    """
+    table = bytearray(_TABLE_SIZE)
+    for position in range(8):
+        others = [bit for bit in range(8) if bit != position]
+        for code in range(pow(3, 7)):
+            player = opponent = 0
+            for bit in others:
+                code, state = divmod(code, 3)
+                if state == 1:
+                    player |= 1 << bit
+                elif state == 2:
+                    opponent |= 1 << bit
+            table[position << 16 | opponent << 8 | player] = _line_flip(
+                position, player, opponent)
+    return bytes(table)
+
+
+def load_flip_table(filename=CACHE_FILE):
+    """Load the flip table from the cache, or build and cache it."""
+    try:
+        with open(filename, "rb") as file_:
+            data = file_.read()
+        if data[:len(_MAGIC)] == _MAGIC and \
+                len(data) == len(_MAGIC) + _TABLE_SIZE:
+            return data[len(_MAGIC):]
+        logger.warning("Flip table cache is broken and will be rebuilt.")
+    except FileNotFoundError:
+        pass
+    table = build_flip_table()
+    try:
+        with open(filename, "wb") as file_:
+            file_.write(_MAGIC + table)
+    except OSError:
+        logger.warning("Flip table could not be cached to %s." % filename)
+    logger.info("Flip table was built.")
+    return table
+
+
+def build_square_lines():
+    """Return the line masks and lookups of every square.
+
+    Returns
+    -------
+    square_lines : list of tuple
+        For each square, (mask, multiplier, position << 16, scatter) of the
+        four lines through it. scatter[byte] is the board of the line bits.
+    """
+    square_lines = [[] for _ in range(64)]
+    for line in _lines():
+        mask = sum(1 << square for square in line)
+        multiplier = _line_multiplier(line)
+        positions = {
+            square: _gather(1 << square, mask, multiplier).bit_length() - 1
+            for square in line
+        }
+        scatter = [
+            sum(
+                1 << square for square in line
+                if (byte >> positions[square]) & 1)
+            for byte in range(256)
+        ]
+        for square in line:
+            square_lines[square].append(
+                (mask, multiplier, positions[square] << 16, scatter))
+    return [tuple(lines) for lines in square_lines]
+
+
+FLIP_TABLE = load_flip_table()
+SQUARE_LINES = build_square_lines()
+LINE_MASKS = [
+    sum(mask for mask, _, _, _ in lines) for lines in SQUARE_LINES]
+
+
+def flip_table(player: int, opponent: int, put_loc: int):
+    """Return disks reversed by putting a disk on put_loc.
+
+    Parameters
+    ----------
+    player, opponent : int
+        64-bit intager of player's and opponent's disks.
+    put_loc : int
+        Integer from 0 to 63.
+
+    Returns
+    -------
+    reverse_bit : int
+        64-bit intager which represents the reversed disks.
+    """
+    reverse_bit = 0
+    for mask, multiplier, position, scatter in SQUARE_LINES[put_loc]:
+        reverse_bit |= scatter[FLIP_TABLE[
+            position
+            | ((((opponent & mask) * multiplier) >> 48) & 0xff00)
+            | ((((player & mask) * multiplier) >> 56) & 0xff)
+        ]]
+    return reverse_bit
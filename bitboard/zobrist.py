@@ -0,0 +1,89 @@
+"""
+This file defines Zobrist hashing of Reversi positions.
+A key is the XOR of a random 64-bit code for every disk and for the side to
+move, so it can be updated from the put disk and the reversed disks alone.
+"""
+
+import random
+
+__all__ = ["hash_board", "update_key", "pass_key"]
+
+_SEED = 0x5eed
+_rng = random.Random(_SEED)
+
+# ZOBRIST[color][square]
+ZOBRIST = [[_rng.getrandbits(64) for _ in range(64)] for _ in range(2)]
+ZOBRIST_TURN = _rng.getrandbits(64)
+
+
+def _build_reverse_byte():
+    """Return XOR of the codes of reversed disks for each row and byte.
+
+    A reversed disk changes its color, so both colors' codes are toggled.
+    """
+    reverse = [black ^ white for black, white in zip(*ZOBRIST)]
+    tables = []
+    for row in range(8):
+        table = [0] * 256
+        for byte in range(1, 256):
+            low = byte & -byte
+            table[byte] = \
+                table[byte ^ low] ^ reverse[row*8 + low.bit_length() - 1]
+        tables.append(table)
+    return tables
+
+
+_REVERSE_BYTE = _build_reverse_byte()
+
+
+def hash_board(black_board: int, white_board: int, turn: int = 0):
+    """Compute the key of a position from scratch.
+
+    Parameters
+    ----------
+    black_board, white_board : int
+        64-bit intager.
+    turn : int
+        Black is 0 and white is 1.
+    """
+    key = ZOBRIST_TURN if turn else 0
+    for color, board in enumerate((black_board, white_board)):
+        codes = ZOBRIST[color]
+        while board:
+            low = board & -board
+            key ^= codes[low.bit_length() - 1]
+            board ^= low
+    return key
+
+
+def update_key(key: int, turn: int, put_loc: int, reverse_bit: int):
+    """Return the key after the side to move put a disk.
+
+    Parameters
+    ----------
+    key : int
+        Key of the position before the move.
+    turn : int
+        Color who puts a disk. Black is 0 and white is 1.
+    put_loc : int
+        Integer from 0 to 63.
+    reverse_bit : int
+        Reversed disks returned by the flip engine.
+    """
+    table = _REVERSE_BYTE
+    return (
+        key ^ ZOBRIST_TURN ^ ZOBRIST[turn][put_loc]
+        ^ table[0][reverse_bit & 0xff]
+        ^ table[1][(reverse_bit >> 8) & 0xff]
+        ^ table[2][(reverse_bit >> 16) & 0xff]
+        ^ table[3][(reverse_bit >> 24) & 0xff]
+        ^ table[4][(reverse_bit >> 32) & 0xff]
+        ^ table[5][(reverse_bit >> 40) & 0xff]
+        ^ table[6][(reverse_bit >> 48) & 0xff]
+        ^ table[7][reverse_bit >> 56]
+    )
+
+
+def pass_key(key: int):
+    """Return the key after the side to move passed."""
+    return key ^ ZOBRIST_TURN
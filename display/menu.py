@@ -9,6 +9,11 @@ from strategy import Strategy
 
 class MenuBar(wx.MenuBar):
     """Set menu bar."""
+
+    # Seconds per move of the min-max strategy, which is searched on the
+    # timer of the frame, so a longer search would freeze the window.
+    TIME_LIMIT = 0.5
+
     def __init__(self, frame):
         super().__init__()
         self._frame = frame
@@ -52,17 +57,18 @@ class MenuBar(wx.MenuBar):
 
     def save_board(self):
         """Save current board."""
-        black_board, white_board, board_log, board_back = \
+        black_board, white_board, board_log, board_back, move_log = \
             self._frame.othello.return_state()
         self._board_save = copy.deepcopy([black_board, white_board])
         self._board_log = copy.deepcopy(board_log)
         self._board_back = copy.deepcopy(board_back)
+        self._move_log = list(move_log)
 
     def load_board(self):
         """Load saved board."""
         self._frame.othello.load_state(
             self._board_save[0], self._board_save[1],
-            self._board_log, self._board_back,
+            self._board_log, self._board_back, self._move_log,
         )
 
     def initialize_game(self):
@@ -107,7 +113,8 @@ class MenuBar(wx.MenuBar):
         if event.GetId() == self._id_minimize:
             return self._frame.othello.change_strategy("minimize", False)
         if event.GetId() == self._id_minmax:
-            return self._frame.othello.change_strategy("min-max", False)
+            return self._frame.othello.change_strategy(
+                "min-max", False, MenuBar.TIME_LIMIT)
 
     def event_manager(self, event):
         if event.GetId() == wx.ID_SAVE:
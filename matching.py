@@ -6,9 +6,11 @@ from itertools import combinations
 from tqdm import tqdm
 
 import matplotlib.pyplot as plt
+import numpy as np
 
 from bitboard import OthelloGame
 from matching import EloRating
+from matching.lockstep import BATCH_STRATEGIES, play_lockstep
 from strategy import Strategy
 
 repeat = 10
@@ -126,7 +128,34 @@ def runby1():
     print("Game was played", len(parameters)*2, "times.")
 
 
+def runLockstep():
+    """Play the games of strategies in BATCH_STRATEGIES in lockstep."""
+    rng = np.random.RandomState()
+    pairs = [
+        (strategy1, strategy2)
+        for strategy1, strategy2 in combinations(STRAT, 2)
+        if strategy1 in BATCH_STRATEGIES and strategy2 in BATCH_STRATEGIES
+    ]
+    # Only the batchable pairs are played.
+    progress_bar.reset(total=len(pairs) * repeat)
+    for strategy1, strategy2 in pairs:
+        # Strategy1 plays black and white alternately, as `matching` does.
+        results = play_lockstep(strategy1, strategy2, [0, 1]*repeat, rng)
+        for rslt_black, rslt_white in zip(results[::2], results[1::2]):
+            rslt_cnt = update_cnt([0, 0, 0], rslt_black)
+            rslt_cnt = update_cnt(rslt_cnt, rslt_white)
+            Rating.update_rating(
+                strategy1, strategy2, 2, rslt_cnt[0] + rslt_cnt[2]/2)
+            progress_bar.update(1)
+
+    Rating.save_rating()
+    progress_bar.close()
+    print(Rating._rating)
+    print("Game was played", len(pairs)*repeat*2, "times.")
+
+
 if __name__ == "__main__":
     # runMP(plot=True)
     # runby1()
+    # runLockstep()
     cProfile.run("runby1()", filename="./matching/matching.prof", sort=2)
@@ -1,4 +1,6 @@
 from .elorating import EloRating
+from .lockstep import play_lockstep
+from .tournament import Tournament
 from .trueskill_ import TrueSkill
 
-__All__ = ["EloRating", "TrueSkill"]
+__All__ = ["EloRating", "TrueSkill", "Tournament", "play_lockstep"]
@@ -0,0 +1,115 @@
+"""Play many games at once, advancing all of them by one ply per step."""
+
+import numpy as np
+
+from bitboard import batch
+from bitboard.bitboard import BitBoard
+from bitboard.core import PASS
+from strategy.maximize import Maximize
+from strategy.minimize import Minimize
+from strategy.random import Random
+
+BATCH_STRATEGIES = {
+    "random": Random,
+    "maximize": Maximize,
+    "minimize": Minimize,
+}
+
+
+def load_batch_strategy(strategy: str):
+    """Return the strategy instance which has `put_disks`."""
+    if strategy not in BATCH_STRATEGIES:
+        raise KeyError(strategy)
+    return BATCH_STRATEGIES[strategy]()
+
+
+def play_lockstep(
+        strategy1, strategy2, player_clr, rng=None, record: bool = False,
+        ):
+    """Play games between strategy1 and strategy2 in lockstep.
+
+    Parameters
+    ----------
+    strategy1, strategy2 : str
+        Names of the strategies in `BATCH_STRATEGIES`.
+    player_clr : array_like of int
+        Color of strategy1 for each game. Black is 0 and white is 1.
+    rng : numpy.random.RandomState (optional)
+    record : bool
+        If True, the moves of the games are returned too.
+
+    Returns
+    -------
+    results : list of str
+        "WIN", "LOSE" or "DRAW" of strategy1, as `set_match` returns.
+    moves : list of bytes
+        Squares put in order, and PASS for passes, as `move_log` of
+        `OthelloGame`. Only if record is True.
+    """
+    if rng is None:
+        rng = np.random.RandomState()
+    strategies = [
+        load_batch_strategy(strategy1), load_batch_strategy(strategy2)]
+    player_clr = np.asarray(player_clr, dtype=np.int64)
+    number = len(player_clr)
+
+    board = np.empty((2, number), dtype=np.uint64)
+    board[BitBoard.BLACK] = BitBoard.INIT_BLACK
+    board[BitBoard.WHITE] = BitBoard.INIT_WHITE
+    turn = np.zeros(number, dtype=np.int64)
+    games = np.arange(number)
+    playing = np.ones(number, dtype=bool)
+    if record:
+        # A game has 60 moves and fewer passes than moves.
+        moves = np.zeros((number, 120), dtype=np.uint8)
+        plies = np.zeros(number, dtype=np.int64)
+
+    while playing.any():
+        index = games[playing]
+        player = board[turn[index], index]
+        opponent = board[turn[index] ^ 1, index]
+        reversible = batch.moves(player, opponent)
+
+        # A game ends when neither side can put a disk.
+        passed = reversible == 0
+        if passed.any():
+            finished = passed.copy()
+            finished[passed] = batch.moves(
+                opponent[passed], player[passed]) == 0
+            playing[index[finished]] = False
+            if record:
+                passing = index[passed & ~finished]
+                moves[passing, plies[passing]] = PASS
+                plies[passing] += 1
+
+        on_player = turn[index] == player_clr[index]
+        for selected, strategy in zip(
+                (~passed & on_player, ~passed & ~on_player), strategies):
+            if not selected.any():
+                continue
+            put_loc = strategy.put_disks(
+                player[selected], opponent[selected], reversible[selected],
+                rng)
+            reverse_bit = batch.flip(
+                player[selected], opponent[selected], put_loc)
+            put_bit = np.uint64(1) << put_loc.astype(np.uint64)
+            selected_games = index[selected]
+            board[turn[selected_games], selected_games] ^= \
+                reverse_bit | put_bit
+            board[turn[selected_games] ^ 1, selected_games] ^= reverse_bit
+            if record:
+                moves[selected_games, plies[selected_games]] = put_loc
+                plies[selected_games] += 1
+
+        # Both a put and a pass hand the turn to the opponent.
+        turn[index] ^= 1
+
+    player_count = batch.count(board[player_clr, games])
+    cpu_count = batch.count(board[player_clr ^ 1, games])
+    results = np.where(
+        player_count > cpu_count, "WIN",
+        np.where(player_count < cpu_count, "LOSE", "DRAW"))
+    if record:
+        return results.tolist(), [
+            moves[game, :plies[game]].tobytes() for game in games]
+    return results.tolist()
@@ -0,0 +1,174 @@
+"""Play matches in worker processes which keep their strategies loaded."""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count, islice
+from logging import getLogger
+import multiprocessing
+import os
+import queue
+
+from bitboard import OthelloGame
+from strategy import Strategy
+
+from .selfplay import run_game
+
+logger = getLogger(__name__)
+
+# State of a worker process.
+_worker = {}
+
+
+def _init_worker(strategies, channel):
+    """Load every strategy once for each side of a game."""
+    game = OthelloGame()
+    _worker["strategies"] = dict(
+        (name, (Strategy(game, name), Strategy(game, name)))
+        for name in strategies)
+    _worker["channel"] = channel
+
+
+def _play_chunk(play_id, chunk):
+    """Play games and send each result as it is finished."""
+    strategies = _worker["strategies"]
+    channel = _worker["channel"]
+    for number, black, white, seed in chunk:
+        game = OthelloGame("black")
+        game.set_strategies(strategies[black][0], strategies[white][1])
+        moves, margin = run_game(game, seed)
+        channel.put((play_id, number, moves, margin))
+    return len(chunk)
+
+
+class MatchPool:
+    """Worker processes with loaded strategies to play many games.
+
+    A worker loads the strategies once, with their tables, books and
+    transposition tables, and keeps them for all the games. Games are sent
+    in chunks, and each result comes back through a queue as soon as the
+    game is finished. If the number of games is known, chunks get smaller
+    toward the end, down to a game, so the last long games are spread over
+    the workers instead of keeping the others waiting.
+
+    Parameters
+    ----------
+    strategies : list of str
+        Names of the strategies, as `Strategy.set_strategy`.
+    workers : int (optional)
+        Number of processes. Defaults to the number of CPUs.
+    chunk_size : int
+        Maximum number of games sent to a worker at once.
+    """
+
+    __all__ = ["play", "close"]
+
+    POLL = 0.5
+
+    def __init__(self, strategies, workers: int = None, chunk_size: int = 8):
+        if workers is None:
+            workers = os.cpu_count()
+        self.strategies = list(strategies)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._channel = multiprocessing.Queue()
+        self._executor = ProcessPoolExecutor(
+            workers, initializer=_init_worker,
+            initargs=(self.strategies, self._channel))
+        self._play_ids = count()
+        logger.info("Match pool of %d workers was started." % workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def play(self, games):
+        """Play games and yield their results in finishing order.
+
+        Only a few chunks per worker are sent at once, so games may be a
+        generator of any length.
+
+        Parameters
+        ----------
+        games : iterable of tuple
+            (number, black, white, seed) of each game, where black and
+            white are in strategies. Numbers must be unique. If it has a
+            length, the chunks are sized by the games left.
+
+        Yields
+        ------
+        number : int
+        moves : bytes
+            Squares put in order, and `OthelloGame.PASS` for passes.
+        margin : int
+            Black's disks minus white's.
+        """
+        play_id = next(self._play_ids)
+        left = len(games) if hasattr(games, "__len__") else None
+        games = iter(games)
+        # [future, results to come] of each chunk, and the chunk of each
+        # game to come.
+        chunks = []
+        owners = {}
+        try:
+            while True:
+                while len(chunks) < 2 * self.workers:
+                    size = self.chunk_size
+                    if left is not None:
+                        size = max(1, min(size, left // (4 * self.workers)))
+                    chunk = list(islice(games, size))
+                    if not chunk:
+                        break
+                    if left is not None:
+                        left -= len(chunk)
+                    sent = [self._executor.submit(
+                        _play_chunk, play_id, chunk), len(chunk)]
+                    chunks.append(sent)
+                    for game in chunk:
+                        owners[game[0]] = sent
+                if not chunks:
+                    return
+                try:
+                    result = self._channel.get(timeout=MatchPool.POLL)
+                except queue.Empty:
+                    result = None
+                if result is not None:
+                    if result[0] == play_id:
+                        owners.pop(result[1])[1] -= 1
+                    else:
+                        # A result of an earlier play which was stopped.
+                        result = None
+                # A worker which failed sends nothing more, so it raises.
+                for future, _ in chunks:
+                    if future.done():
+                        future.result()
+                chunks = [sent for sent in chunks if sent[1]]
+                if result is not None:
+                    yield result[1:]
+        finally:
+            self._drain(play_id, owners)
+
+    def _drain(self, play_id, owners):
+        """Cancel the chunks left, and receive the results of the others.
+
+        Every game of a chunk which has started sends its result, so they
+        are counted out of the queue. Results of a chunk which failed are
+        left, and skipped by the next `play`.
+        """
+        finished = {}
+        for sent in owners.values():
+            future = sent[0]
+            if id(future) not in finished:
+                finished[id(future)] = not future.cancel() \
+                    and future.exception() is None
+        expected = set(
+            number for number, sent in owners.items()
+            if finished[id(sent[0])])
+        while expected:
+            result = self._channel.get()
+            if result[0] == play_id:
+                expected.discard(result[1])
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._channel.close()
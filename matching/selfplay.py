@@ -0,0 +1,261 @@
+"""Generate self-play games into shard files.
+
+A shard is a file of `bitboard.record`, so it is read by `RecordReader`
+as the other game records. Shards are numbered as shard-00000.rec, and a
+new one is started when a shard is over the size limit. Games are written
+in the order of their seeds, so the same arguments give the same shards.
+
+python -m matching.selfplay BLACK WHITE [--games N] [--workers N]
+                            [--output DIRECTORY]
+"""
+
+import argparse
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from logging import getLogger
+import os
+import random
+
+import numpy as np
+
+from bitboard import OthelloGame
+from bitboard.record import RecordReader, RecordWriter
+from strategy import Strategy
+
+logger = getLogger(__name__)
+
+SHARD_SIZE = 64 << 20
+
+
+def play_game(black: str, white: str, seed: int = None):
+    """Play a game between strategies.
+
+    Parameters
+    ----------
+    black, white : str
+        Names of the strategies, as `Strategy.set_strategy`.
+    seed : int (optional)
+        Seed of random and numpy.random, for the random strategies.
+
+    Returns
+    -------
+    moves : bytes
+        Squares put in order, and PASS for passes.
+    result : int
+        Black's disks minus white's.
+    """
+    record = play_record(black, white, seed)
+    return record.moves, record.black - record.white
+
+
+def play_record(black: str, white: str, seed: int = None):
+    """Play a game as `play_game` and return its `GameRecord`."""
+    game = OthelloGame("black")
+    game.load_strategy(Strategy)
+    game.change_strategy(black, is_player=True)
+    game.change_strategy(white, is_player=False)
+    return record_game(game, seed)
+
+
+def run_game(game, seed: int = None):
+    """Play an `OthelloGame` whose strategies are set to the end.
+
+    The player of the game is black. Returns the same as `play_game`.
+    """
+    record = record_game(game, seed)
+    return record.moves, record.black - record.white
+
+
+def record_game(game, seed: int = None):
+    """Play a game as `run_game` and return its `GameRecord`."""
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed % (1 << 32))
+    return game.play_headless()
+
+
+class ShardWriter:
+    """Append game records to shards of a limited size.
+
+    Parameters
+    ----------
+    directory : str
+        Directory of the shards, which is created if needed. Shards already
+        in it are kept, and new records go to a new shard.
+    shard_size : int
+        Bytes of a shard, over which the next shard is started.
+    """
+
+    __all__ = ["write", "close"]
+
+    def __init__(self, directory: str, shard_size: int = SHARD_SIZE):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_size = shard_size
+        self._number = len(shard_names(directory))
+        self._writer = None
+        self.games = 0
+
+    def _start(self):
+        self._writer = RecordWriter(os.path.join(
+            self.directory, "shard-%05d.rec" % self._number))
+        self._number += 1
+
+    def write(self, record):
+        """Append a `GameRecord`."""
+        if self._writer is None:
+            self._start()
+        self._writer.write(*record)
+        self.games += 1
+        if self._writer.tell() >= self.shard_size:
+            self._finish()
+
+    def _finish(self):
+        self._writer.close()
+        self._writer = None
+
+    def close(self):
+        if self._writer is not None:
+            self._finish()
+
+
+def shard_names(directory: str):
+    """Return the paths of the shards, in order."""
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.startswith("shard-") and name.endswith(".rec"))
+
+
+class GameDataset:
+    """Read game records of shards by their numbers.
+
+    The shards are mapped by `RecordReader`, so the records are read from
+    the page cache when they are accessed. The records of every shard are
+    indexed when the dataset is opened.
+
+    Parameters
+    ----------
+    directory : str
+        Directory written by `ShardWriter`.
+    """
+
+    __all__ = ["close"]
+
+    def __init__(self, directory: str):
+        self._shards = []
+        self._starts = [0]
+        for name in shard_names(directory):
+            if not os.path.getsize(name):
+                continue
+            reader = RecordReader(name)
+            self._shards.append(reader)
+            self._starts.append(self._starts[-1] + len(reader))
+
+    def __len__(self):
+        return self._starts[-1]
+
+    def __getitem__(self, number: int):
+        """Return the `GameRecord` of a game.
+
+        The record is copied out of the map, so it may be kept after the
+        dataset is closed.
+        """
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError(number)
+        shard = bisect_right(self._starts, number) - 1
+        record = self._shards[shard][number - self._starts[shard]]
+        return record._replace(
+            moves=bytes(record.moves),
+            evals=None if record.evals is None else record.evals.copy(),
+            times=None if record.times is None else record.times.copy())
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+
+    def close(self):
+        for reader in self._shards:
+            reader.close()
+        self._shards = []
+        self._starts = [0]
+
+
+def generate(
+        pairs, games: int, directory: str, workers: int = None,
+        shard_size: int = SHARD_SIZE, seed: int = 0, progress=None,
+        ):
+    """Play games across processes and write them to shards.
+
+    Games are written in the order of their seeds, whatever order they are
+    finished in. Only a few times as many games as the workers are played
+    or waited to be written at once, so memory does not grow with the
+    number of games.
+
+    Parameters
+    ----------
+    pairs : list of tuple of str
+        Names of black's and white's strategies. The games go through the
+        pairs in turn.
+    games : int
+        Number of games.
+    directory : str
+        Directory of the shards.
+    workers : int (optional)
+        Number of processes. Defaults to the number of CPUs.
+    seed : int
+        Game i is played with seed + i.
+    progress : callable (optional)
+        Called with the number of the games finished so far.
+
+    Returns
+    -------
+    games : int
+        Number of the written games.
+    """
+    if workers is None:
+        workers = os.cpu_count()
+    writer = ShardWriter(directory, shard_size)
+    # Game numbers of the futures, and records to be written in order.
+    pending = {}
+    finished = {}
+    submitted = 0
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            while writer.games < games:
+                while submitted < games \
+                        and submitted - writer.games < 4 * workers:
+                    black, white = pairs[submitted % len(pairs)]
+                    future = executor.submit(
+                        play_record, black, white, seed + submitted)
+                    pending[future] = submitted
+                    submitted += 1
+                done = wait(pending, return_when=FIRST_COMPLETED)[0]
+                for future in done:
+                    finished[pending.pop(future)] = future.result()
+                while writer.games in finished:
+                    writer.write(finished.pop(writer.games))
+                if progress is not None:
+                    progress(writer.games)
+    finally:
+        writer.close()
+    logger.info("%d games were written to %s." % (writer.games, directory))
+    return writer.games
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate self-play games.")
+    parser.add_argument("black")
+    parser.add_argument("white")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="./matching/selfplay")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    # Both strategies play black and white alternately.
+    number = generate(
+        [(args.black, args.white), (args.white, args.black)], args.games,
+        args.output, args.workers, seed=args.seed)
+    print("%d games were written to %s." % (number, args.output))
@@ -0,0 +1,261 @@
+"""Run a round-robin tournament which can be stopped and resumed.
+
+A tournament is a directory of
+    tournament.json : the schedule and the progress, saved atomically
+    results.jsonl   : a line of every finished game, in finishing order
+Games are numbered in the schedule, so a resumed tournament plays only the
+games missing from the results. Ratings are computed from the results.
+
+python -m matching.tournament DIRECTORY [--strategies NAME ...]
+                              [--repeat N] [--workers N] [--rate]
+"""
+
+import argparse
+from itertools import combinations
+import json
+from logging import getLogger
+import os
+
+from bitboard.record import to_text
+
+from .elorating import EloRating
+from .pool import MatchPool
+from .trueskill_ import TrueSkill
+
+logger = getLogger(__name__)
+
+CHECKPOINT = "tournament.json"
+RESULTS = "results.jsonl"
+
+
+def read_results(directory: str):
+    """Return the finished games of a tournament.
+
+    A line cut by a crash at the end of the log is ignored.
+
+    Returns
+    -------
+    results : list of dict
+        "game", "black", "white", "margin" (black's disks minus white's)
+        and "moves" of each game.
+    """
+    filename = os.path.join(directory, RESULTS)
+    if not os.path.exists(filename):
+        return []
+    results = []
+    with open(filename) as file_:
+        for line in file_:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning("A broken line of %s was ignored." % filename)
+    return results
+
+
+class Tournament:
+    """Play every pair of strategies and log the games as they finish.
+
+    Each pair plays a game with each color in each round. The games are
+    played by a `MatchPool`, and a finished game is appended and synced to
+    the results as it comes, so a crash loses only the games being played.
+
+    Parameters
+    ----------
+    directory : str
+        Directory of the tournament. If it has a checkpoint, the schedule
+        is loaded from it and the other parameters are ignored.
+    strategies : list of str
+        Names of the strategies, as `Strategy.set_strategy`.
+    repeat : int
+        Number of rounds.
+    seed : int
+        Game i is played with seed + i.
+    """
+
+    __all__ = ["run", "rate", "schedule"]
+
+    def __init__(
+            self, directory: str, strategies=None, repeat: int = 10,
+            seed: int = 0,
+            ):
+        self.directory = directory
+        checkpoint = os.path.join(directory, CHECKPOINT)
+        if os.path.exists(checkpoint):
+            with open(checkpoint) as file_:
+                state = json.load(file_)
+            strategies, repeat, seed = \
+                state["strategies"], state["repeat"], state["seed"]
+            logger.info("Tournament was resumed from %s." % directory)
+        elif strategies is None:
+            raise ValueError("%s has no tournament." % directory)
+        self.strategies = list(strategies)
+        self.repeat = repeat
+        self.seed = seed
+        self._games = self.schedule()
+        os.makedirs(directory, exist_ok=True)
+        self.finished = {result["game"] for result in read_results(directory)}
+        self._save_checkpoint()
+
+    def schedule(self):
+        """Return (number, black, white, seed) of every game in order."""
+        games = []
+        for _ in range(self.repeat):
+            for strategy1, strategy2 in combinations(self.strategies, 2):
+                for black, white in (
+                        (strategy1, strategy2), (strategy2, strategy1)):
+                    games.append(
+                        (len(games), black, white, self.seed + len(games)))
+        return games
+
+    def _save_checkpoint(self):
+        state = {
+            "strategies": self.strategies,
+            "repeat": self.repeat,
+            "seed": self.seed,
+            "games": len(self._games),
+            "finished": len(self.finished),
+        }
+        filename = os.path.join(self.directory, CHECKPOINT)
+        with open(filename + ".tmp", "w") as file_:
+            json.dump(state, file_, indent=4)
+            file_.flush()
+            os.fsync(file_.fileno())
+        os.replace(filename + ".tmp", filename)
+
+    def run(self, workers: int = None, checkpoint: int = 100, progress=None):
+        """Play the games which are not finished.
+
+        Parameters
+        ----------
+        workers : int (optional)
+            Number of processes. Defaults to the number of CPUs.
+        checkpoint : int
+            The progress is saved every this number of games.
+        progress : callable (optional)
+            Called with the number of the finished games.
+
+        Returns
+        -------
+        played : int
+            Number of the games played by this call.
+        """
+        if workers is None:
+            workers = os.cpu_count()
+        remaining = [
+            game for game in self._games if game[0] not in self.finished]
+        logger.info("%d games of %d are left." % (
+            len(remaining), len(self._games)))
+        played = 0
+        self._repair_log()
+        with open(os.path.join(self.directory, RESULTS), "a") as log, \
+                MatchPool(self.strategies, workers) as pool:
+            try:
+                for number, moves, margin in pool.play(remaining):
+                    self._log(log, number, moves, margin)
+                    played += 1
+                    if not played % checkpoint:
+                        self._save_checkpoint()
+                    if progress is not None:
+                        progress(len(self.finished))
+            finally:
+                self._save_checkpoint()
+        return played
+
+    def _repair_log(self):
+        """Cut a line broken by a crash, to which games would be appended."""
+        filename = os.path.join(self.directory, RESULTS)
+        if not os.path.exists(filename):
+            return
+        with open(filename, "r+b") as file_:
+            size = file_.seek(0, os.SEEK_END)
+            if not size:
+                return
+            file_.seek(size - 1)
+            if file_.read(1) == b"\n":
+                return
+            file_.seek(0)
+            file_.truncate(file_.read().rfind(b"\n") + 1)
+            logger.warning("A broken line of %s was cut." % filename)
+
+    def _log(self, log, number, moves, margin):
+        """Append a finished game to the results, and sync it."""
+        _, black, white, _ = self._games[number]
+        log.write(json.dumps({
+            "game": number, "black": black, "white": white,
+            "margin": margin, "moves": to_text(moves, ""),
+        }) + "\n")
+        log.flush()
+        os.fsync(log.fileno())
+        self.finished.add(number)
+
+    def rate(self, method: str = "elo"):
+        """Compute ratings from the results in one pass.
+
+        The games are rated in the order of their numbers, not of the log,
+        which depends on the workers and the resumes, so the same games
+        always give the same ratings.
+
+        Parameters
+        ----------
+        method : str
+            "elo" for `EloRating`, or "trueskill" for `TrueSkill`.
+
+        Returns
+        -------
+        rating : EloRating or TrueSkill
+            Ratings of the strategies, which are saved in the directory by
+            `save_rating`.
+        """
+        if method == "elo":
+            rating = EloRating(
+                self.strategies, os.path.join(self.directory, "elo.pkl"))
+        elif method == "trueskill":
+            rating = TrueSkill(
+                self.strategies,
+                os.path.join(self.directory, "trueskill.pkl"))
+        else:
+            raise KeyError(method)
+        rating.initialize_rating()
+        results = sorted(
+            read_results(self.directory), key=lambda result: result["game"])
+        for result in results:
+            black, white, margin = \
+                result["black"], result["white"], result["margin"]
+            if method == "elo":
+                rating.update_rating(
+                    black, white, 1, (margin > 0) + (margin == 0) / 2)
+            elif margin < 0:
+                rating.update_rating(white, black)
+            else:
+                rating.update_rating(black, white, drawn=margin == 0)
+        return rating
+
+
+if __name__ == "__main__":
+    from tqdm import tqdm
+
+    parser = argparse.ArgumentParser(description="Run a tournament.")
+    parser.add_argument("directory")
+    parser.add_argument(
+        "--strategies", nargs="*",
+        default=["random", "maximize", "minimize", "min-max"])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--rate", action="store_true", help="Rate without playing.")
+    args = parser.parse_args()
+
+    tournament = Tournament(args.directory, args.strategies, args.repeat)
+    if not args.rate:
+        progress_bar = tqdm(
+            total=len(tournament.schedule()),
+            initial=len(tournament.finished))
+        tournament.run(
+            args.workers,
+            progress=lambda finished: progress_bar.update(
+                finished - progress_bar.n))
+        progress_bar.close()
+    for method in ("elo", "trueskill"):
+        rating = tournament.rate(method)
+        rating.save_rating()
+        print(method, rating._rating)
@@ -0,0 +1,249 @@
+"""An opening book of searched positions in a memory-mapped file.
+
+The file is a header followed by records sorted by key.
+    header : magic (8 bytes), number of records (uint64)
+    record : key (uint64), score (int16), move (int8), result (int8)
+The score is of the side to move, clamped to int16. The result is 1 if
+the search found a won line, -1 if a lost one, and 0 otherwise, so a won
+line is not taken for a high evaluation.
+The key is the Zobrist key of the canonical position (see `symmetry`),
+and the move is of the canonical position, so every symmetric position
+shares a record.
+
+python -m strategy.book [--plies N] [--depth N] [--output FILE]
+"""
+
+import argparse
+from logging import getLogger
+import mmap
+import os
+import struct
+
+from bitboard.bitboard import BitBoard
+from bitboard.core import flip, moves
+from bitboard.symmetry import canonical, restore_square
+from bitboard.zobrist import hash_board
+
+logger = getLogger(__name__)
+
+BOOK_FILE = os.path.join(os.path.dirname(__file__), "book.bin")
+_MAGIC = b"RVBK\x02\x00\x00\x00"
+_HEADER = struct.Struct("<8sQ")
+_RECORD = struct.Struct("<Qhbb")
+
+
+def position_key(player: int, opponent: int):
+    """Return the key of the canonical position and the symmetry to it."""
+    player, opponent, symmetry = canonical(player, opponent)
+    return hash_board(player, opponent), symmetry
+
+
+def expand(
+        plies: int, player=BitBoard.INIT_BLACK, opponent=BitBoard.INIT_WHITE,
+        ):
+    """Return the distinct positions within plies from a position.
+
+    Returns
+    -------
+    positions : dict
+        (player, opponent) of the side to move by the canonical key.
+        Positions without a move are excluded.
+    """
+    positions = {}
+    frontier = [(player, opponent)]
+    for _ in range(plies + 1):
+        next_frontier = []
+        for player, opponent in frontier:
+            reversible = moves(player, opponent)
+            if not reversible:
+                continue
+            key = position_key(player, opponent)[0]
+            if key in positions:
+                continue
+            positions[key] = (player, opponent)
+            for move in range(64):
+                if (reversible >> move) & 1:
+                    reverse_bit = flip(player, opponent, move)
+                    next_frontier.append((
+                        opponent ^ reverse_bit,
+                        player ^ reverse_bit ^ (1 << move)))
+        frontier = next_frontier
+    return positions
+
+
+def write_book(records, filename=BOOK_FILE, win_value=None):
+    """Write records of (key, move, score) sorted by key.
+
+    Moves must be of the canonical positions. A key given twice keeps the
+    last record.
+
+    Parameters
+    ----------
+    win_value : int (optional)
+        Score of a won line, e.g. `Negamax.WIN_VALUE`. Scores of it or
+        over are written as won, and of its negative or below as lost.
+    """
+    records = sorted(dict(
+        (key, (move, score)) for key, move, score in records).items())
+    with open(filename, "wb") as file_:
+        file_.write(_HEADER.pack(_MAGIC, len(records)))
+        for key, (move, score) in records:
+            result = 0
+            if win_value is not None:
+                if score >= win_value:
+                    result = 1
+                elif score <= -win_value:
+                    result = -1
+            score = max(min(int(score), 0x7fff), -0x7fff)
+            file_.write(_RECORD.pack(key, score, move, result))
+    logger.info("Book of %d positions was written to %s." % (
+        len(records), filename))
+    return len(records)
+
+
+def build_book(search, plies: int = 6, filename=BOOK_FILE, positions=None):
+    """Search positions and write them to a book.
+
+    Parameters
+    ----------
+    search : Negamax
+        Strategy whose `search` returns (evaluation, move) of the side to
+        move. `Minmax.search` needs the game of `put_disk`.
+    plies : int
+        Positions within plies from the initial position are searched.
+    positions : iterable of tuple (optional)
+        (player, opponent) of the side to move, e.g. from self-play
+        games. If given, they are searched instead of the expansion.
+    """
+    if positions is None:
+        positions = expand(plies).values()
+    records = {}
+    for player, opponent in positions:
+        if not moves(player, opponent):
+            continue
+        canonical_player, canonical_opponent, _ = canonical(player, opponent)
+        key = hash_board(canonical_player, canonical_opponent)
+        if key in records:
+            continue
+        # The search takes black and white, so the side to move is black.
+        search.set_color(BitBoard.BLACK)
+        search.nodes = 0
+        score, move = search.search(
+            canonical_player, canonical_opponent, BitBoard.BLACK,
+            search._depth)
+        records[key] = (key, move, score)
+    return write_book(records.values(), filename, search.WIN_VALUE)
+
+
+class OpeningBook:
+    """Look up the best move of a position in a book file.
+
+    The file is mapped on the first lookup, so opening a book costs
+    nothing, and all the processes reading it share the page cache.
+
+    Parameters
+    ----------
+    filename : str
+        Path of a file written by `write_book`.
+    """
+
+    __all__ = ["lookup", "close"]
+
+    def __init__(self, filename=BOOK_FILE):
+        self.filename = filename
+        self._file = None
+        self._map = None
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        self._open()
+        return self._size
+
+    def _open(self):
+        if self._map is not None:
+            return
+        self._file = open(self.filename, "rb")
+        self._map = mmap.mmap(
+            self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC \
+                or len(self._map) != _HEADER.size + size * _RECORD.size:
+            self.close()
+            raise ValueError("%s is not a book file." % self.filename)
+        self._size = size
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = self._file = None
+
+    def record(self, index: int):
+        """Return (key, score, move, result) of the index-th record."""
+        return _RECORD.unpack_from(
+            self._map, _HEADER.size + index * _RECORD.size)
+
+    def find(self, key: int):
+        """Return (score, move, result) of the canonical key, or None."""
+        self._open()
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            record = self.record(middle)
+            if record[0] < key:
+                low = middle + 1
+            elif record[0] > key:
+                high = middle
+            else:
+                return record[1:]
+        return None
+
+    def lookup(self, player: int, opponent: int):
+        """Return the book move and its score.
+
+        Parameters
+        ----------
+        player, opponent : int
+            64-bit intager of the side to move and the other.
+
+        Returns
+        -------
+        move, score, result : int or None
+            None if the position is not in the book. result is 1 for a won
+            line, -1 for a lost one and 0 otherwise.
+        """
+        key, symmetry = position_key(player, opponent)
+        found = self.find(key)
+        if found is None:
+            self.misses += 1
+            return None, None, None
+        score, move, result = found
+        move = restore_square(move, symmetry)
+        # Guard against a collision of keys.
+        if not (moves(player, opponent) >> move) & 1:
+            self.misses += 1
+            return None, None, None
+        self.hits += 1
+        return move, score, result
+
+
+def load_book(filename=BOOK_FILE):
+    """Return the book of the file, or None if there is no file."""
+    if not os.path.exists(filename):
+        return None
+    return OpeningBook(filename)
+
+
+if __name__ == "__main__":
+    from .negamax import Negamax
+
+    parser = argparse.ArgumentParser(description="Build an opening book.")
+    parser.add_argument("--plies", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--output", default=BOOK_FILE)
+    args = parser.parse_args()
+    number = build_book(
+        Negamax(args.depth, 4 << 20, 0), args.plies, args.output)
+    print("%d positions were written to %s." % (number, args.output))
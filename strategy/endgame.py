@@ -0,0 +1,231 @@
+"""Solve the end of the game exactly."""
+
+from logging import getLogger
+import time
+
+from bitboard.core import count, flip, moves
+
+logger = getLogger(__name__)
+
+# Masks of the 4 quadrants, used for the parity of empty squares.
+QUADRANTS = [
+    0x000000000f0f0f0f, 0x00000000f0f0f0f0,
+    0x0f0f0f0f00000000, 0xf0f0f0f000000000,
+]
+_QUADRANT_OF = [
+    next(quadrant for quadrant in QUADRANTS if (quadrant >> num) & 1)
+    for num in range(64)
+]
+
+
+class _Timeout(Exception):
+    """Raised inside the search when the deadline has passed."""
+
+
+class Endgame:
+    """Find the best move by reading the game to the end.
+
+    Parameters
+    ----------
+    empties : int
+        The solver is used when the number of empty squares is this or less.
+    exact : bool
+        If True, the final disk difference is maximized. If False, only
+        win, draw or loss is proved, which is faster.
+    """
+
+    __all__ = ["put_disk", "solve", "is_applicable"]
+
+    LAST_EMPTIES = 4
+    WIN = 1
+    DRAW = 0
+    LOSE = -1
+
+    def __init__(self, empties: int = 12, exact: bool = True):
+        self.empties = empties
+        self.exact = exact
+        self.nodes = 0
+        self.elapsed = 0.
+        self._deadline = None
+
+    def is_applicable(self, black_board: int, white_board: int):
+        """Return wheather the number of empties is within the threshold."""
+        return 64 - count(black_board | white_board) <= self.empties
+
+    @property
+    def nodes_per_sec(self):
+        return self.nodes / self.elapsed if self.elapsed else 0.
+
+    def solve(self, player: int, opponent: int, deadline: float = None):
+        """Read the position to the end.
+
+        Parameters
+        ----------
+        player, opponent : int
+            64-bit intager of player's and opponent's disks.
+        deadline : float (optional)
+            Time of `time.perf_counter` at which the search is abandoned.
+
+        Returns
+        -------
+        score, move : int
+            Score is the final disk difference of player in the exact mode,
+            and WIN, DRAW or LOSE otherwise. Move is -1 if player must pass.
+
+        Raises
+        ------
+        _Timeout
+            If the deadline has passed before the end was read.
+        """
+        self.nodes = 0
+        start = time.perf_counter()
+        self._deadline = deadline
+        try:
+            best_score, best_move = self._solve_root(player, opponent)
+        finally:
+            self._deadline = None
+        self.elapsed = time.perf_counter() - start
+        if not self.exact:
+            best_score = (best_score > 0) - (best_score < 0)
+        logger.info(
+            "Endgame was solved: score %d, %d nodes, %.0f nodes/s." % (
+                best_score, self.nodes, self.nodes_per_sec))
+        return best_score, best_move
+
+    def _solve_root(self, player, opponent):
+        if self.exact:
+            alpha, beta = -64, 64
+        else:
+            alpha, beta = -1, 1
+
+        best_score, best_move = -65, -1
+        reversible = moves(player, opponent)
+        for move in self._order(player, opponent, reversible):
+            reverse_bit = flip(player, opponent, move)
+            score = -self._search(
+                opponent ^ reverse_bit,
+                player ^ reverse_bit ^ (1 << move),
+                -beta, -alpha, False)
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if best_move == -1:
+            best_score = -self._search(opponent, player, -beta, -alpha, True)
+        return best_score, best_move
+
+    def put_disk(self, othello, deadline: float = None):
+        player, opponent = othello.board.return_player_board(othello.turn)
+        return self.solve(player, opponent, deadline)[1]
+
+    @staticmethod
+    def _final_score(player, opponent):
+        return count(player) - count(opponent)
+
+    def _order(self, player, opponent, reversible):
+        """Order moves fastest-first, preferring odd regions on ties.
+
+        Moves that leave the opponent fewer replies are searched first,
+        and moves in a quadrant with an odd number of empties come next.
+        """
+        blank_board = ~(player | opponent) & 0xffffffffffffffff
+        odd = 0
+        for quadrant in QUADRANTS:
+            if count(blank_board & quadrant) & 1:
+                odd |= quadrant
+        ordered = []
+        while reversible:
+            low = reversible & -reversible
+            reversible ^= low
+            move = low.bit_length() - 1
+            reverse_bit = flip(player, opponent, move)
+            mobility = count(moves(
+                opponent ^ reverse_bit, player ^ reverse_bit ^ low))
+            ordered.append((mobility * 2 + (not (odd & low)), move))
+        ordered.sort()
+        return [move for _, move in ordered]
+
+    def _search(self, player, opponent, alpha, beta, passed):
+        """Negamax alpha-beta search, returning fail-soft scores."""
+        self.nodes += 1
+        # The last empties are searched in far less time than a check.
+        if self._deadline is not None \
+                and time.perf_counter() > self._deadline:
+            raise _Timeout
+        blank_board = ~(player | opponent) & 0xffffffffffffffff
+        if count(blank_board) <= Endgame.LAST_EMPTIES:
+            return self._search_last(
+                player, opponent, alpha, beta, self._parity_order(blank_board),
+                passed)
+
+        reversible = moves(player, opponent)
+        if not reversible:
+            if passed:
+                return self._final_score(player, opponent)
+            return -self._search(opponent, player, -beta, -alpha, True)
+
+        best_score = -65
+        for move in self._order(player, opponent, reversible):
+            reverse_bit = flip(player, opponent, move)
+            score = -self._search(
+                opponent ^ reverse_bit,
+                player ^ reverse_bit ^ (1 << move),
+                -beta, -alpha, False)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
+    @staticmethod
+    def _parity_order(blank_board):
+        """Return empty squares, those in odd quadrants first."""
+        odd = []
+        even = []
+        squares = blank_board
+        while squares:
+            low = squares & -squares
+            squares ^= low
+            move = low.bit_length() - 1
+            if count(blank_board & _QUADRANT_OF[move]) & 1:
+                odd.append(move)
+            else:
+                even.append(move)
+        return odd + even
+
+    def _search_last(self, player, opponent, alpha, beta, empties, passed):
+        """Search the last few empties without generating moves.
+
+        Every empty square is tried directly, so no reversible area or
+        move ordering is computed.
+        """
+        self.nodes += 1
+        best_score = -65
+        for index, move in enumerate(empties):
+            reverse_bit = flip(player, opponent, move)
+            if not reverse_bit:
+                continue
+            if len(empties) == 1:
+                return self._final_score(
+                    player ^ reverse_bit ^ (1 << move),
+                    opponent ^ reverse_bit)
+            score = -self._search_last(
+                opponent ^ reverse_bit,
+                player ^ reverse_bit ^ (1 << move),
+                -beta, -alpha, empties[:index] + empties[index + 1:], False)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        return best_score
+        if best_score == -65:
+            if passed or not empties:
+                return self._final_score(player, opponent)
+            return -self._search_last(
+                opponent, player, -beta, -alpha, empties, True)
+        return best_score
@@ -0,0 +1,127 @@
+"""Evaluate positions by looking up tables of weighted squares."""
+
+
+class WeightedSquares:
+    """Sum of the weights of one's squares minus those of the opponent's.
+
+    The weights are precomputed for every pattern of disks in a row, so an
+    evaluation costs 8 lookups per board.
+
+    Parameters
+    ----------
+    weights : list of int
+        64 weights, indexed by square.
+    """
+
+    __all__ = ["evaluate", "row_value"]
+
+    def __init__(self, weights):
+        if len(weights) != 64:
+            raise ValueError("64 weights are required.")
+        self.weights = list(weights)
+        # rows[row][byte]
+        self.rows = []
+        for row in range(8):
+            values = [0] * 256
+            for byte in range(1, 256):
+                low = byte & -byte
+                values[byte] = values[byte ^ low] \
+                    + self.weights[row*8 + low.bit_length() - 1]
+            self.rows.append(values)
+
+    def __call__(self, player: int, opponent: int):
+        return self.evaluate(player, opponent)
+
+    def row_value(self, board: int):
+        """Return the sum of the weights of the disks."""
+        rows = self.rows
+        return (
+            rows[0][board & 0xff]
+            + rows[1][(board >> 8) & 0xff]
+            + rows[2][(board >> 16) & 0xff]
+            + rows[3][(board >> 24) & 0xff]
+            + rows[4][(board >> 32) & 0xff]
+            + rows[5][(board >> 40) & 0xff]
+            + rows[6][(board >> 48) & 0xff]
+            + rows[7][board >> 56]
+        )
+
+    def evaluate(self, player: int, opponent: int):
+        """Return the evaluation of player.
+
+        Parameters
+        ----------
+        player, opponent : int
+            64-bit intager.
+        """
+        return self.row_value(player) - self.row_value(opponent)
+
+
+class IncrementalEvaluator:
+    """Keep the weighted-square score of the searched position up to date.
+
+    A move changes only the put square and the reversed disks, so the score
+    is updated from them on `make` and restored on `unmake`. When the move
+    changes the phase, the score is computed again by the next table.
+
+    Parameters
+    ----------
+    evaluators : list of WeightedSquares
+        Evaluator of each phase.
+    border : int
+        64-bit intager. The phase is 1 once a disk is on it, and 0 before.
+    """
+
+    __all__ = ["reset", "make", "unmake", "value"]
+
+    BORDER = 0xff818181818181ff
+
+    def __init__(self, evaluators, border: int = BORDER):
+        self.evaluators = evaluators
+        self.border = border
+        self.reset(0, 0)
+
+    def reset(self, black_board: int, white_board: int):
+        """Compute the score of a position from scratch."""
+        self.phase = int(bool((black_board | white_board) & self.border))
+        # Score of black minus white.
+        self.score = self.evaluators[self.phase](black_board, white_board)
+        self._stack = []
+
+    def make(
+            self, turn: int, put_loc: int, reverse_bit: int,
+            black_board: int, white_board: int,
+            ):
+        """Update the score by a move.
+
+        Parameters
+        ----------
+        turn : int
+            Color who puts a disk. Black is 0 and white is 1.
+        put_loc : int
+            Integer from 0 to 63.
+        reverse_bit : int
+            Reversed disks, which move from one side to the other.
+        black_board, white_board : int
+            64-bit intager after the move, used only if the phase changes.
+        """
+        self._stack.append((self.phase, self.score))
+        if not self.phase and (self.border >> put_loc) & 1:
+            self.phase = 1
+            self.score = self.evaluators[1](black_board, white_board)
+            return
+        evaluator = self.evaluators[self.phase]
+        delta = evaluator.weights[put_loc] \
+            + 2 * evaluator.row_value(reverse_bit)
+        if turn:
+            self.score -= delta
+        else:
+            self.score += delta
+
+    def unmake(self):
+        """Restore the score before the last move."""
+        self.phase, self.score = self._stack.pop()
+
+    def value(self, player_clr: int):
+        """Return the evaluation of the color."""
+        return -self.score if player_clr else self.score
@@ -2,6 +2,11 @@
 
 import random
 
+import numpy as np
+
+from bitboard import batch
+from bitboard.core import count, flip, squares
+
 
 class Minimize:
     def __init__(self):
@@ -12,17 +17,35 @@ class Minimize:
         min_strategy = []
         min_merit = float("inf")
 
-        candidates = []
-        for num in range(64):
-            if (pow(2, num)) & othello.reversible:
-                candidates.append(num)
+        candidates = squares(othello.reversible)
+        player, opponent = othello.board.return_player_board(turn)
+        player_count = count(player) + 1
         for candidate in candidates:
-            new_board = othello.board.simulate_play(
-                othello.turn, candidate)
-            counter = othello.board.count_disks(*new_board)
-            if min_merit > counter[turn]:
+            merit = player_count + count(flip(player, opponent, candidate))
+            if min_merit > merit:
                 min_strategy = [candidate]
-                min_merit = counter[turn]
-            elif min_merit == counter[turn]:
+                min_merit = merit
+            elif min_merit == merit:
                 min_strategy.append(candidate)
         return random.choice(min_strategy)
+
+    def put_disks(self, player, opponent, reversible, rng):
+        """Put disks to minimize number of one's disks in a batch of games.
+
+        Parameters
+        ----------
+        player, opponent, reversible : numpy.ndarray of uint64
+            Boards of the games, all of which have a reversible position.
+        rng : numpy.random.RandomState
+
+        Returns
+        -------
+        put_loc : numpy.ndarray of int
+            Integers from 0 to 63. Ties are broken randomly.
+        """
+        games, candidates = np.nonzero(batch.bits(reversible))
+        merit = batch.count(
+            batch.flip(player[games], opponent[games], candidates))
+        score = np.full((len(player), 64), -np.inf)
+        score[games, candidates] = -merit + rng.random_sample(len(games))
+        return score.argmax(axis=1)
@@ -1,5 +1,14 @@
 """Various strategies for othello."""
 import pickle
+import time
+
+from bitboard.core import count, squares
+from bitboard.zobrist import hash_board, pass_key, update_key
+
+from .endgame import Endgame, _Timeout
+from .evaluation import IncrementalEvaluator, WeightedSquares
+from .ordering import MoveOrdering
+from .transposition import TranspositionTable
 
 
 class Minmax:
@@ -7,7 +16,38 @@ class Minmax:
 
     __all__ = ["put_disk"]
 
-    def __init__(self, depth = 4):
+    TABLE_DEPTH = 2
+
+    def __init__(
+            self, depth=4, memory=0, endgame=0, time_limit=None,
+            ordering=True, incremental=False,
+            ):
+        """
+        Parameters
+        ----------
+        depth : int
+            Depth of the search. With `time_limit`, the maximum depth.
+        memory : int
+            Memory budget of the transposition table in bytes.
+            If 0, no table is used. A search of a few plies finds few
+            transpositions, so the table pays with `time_limit` or deep
+            searches, e.g. 4 << 20.
+        endgame : int
+            With this number of empty squares or less, the game is read to
+            the end by `Endgame` instead. If 0, the solver is not used.
+            With `time_limit`, a solver which runs out of time falls back
+            to the iterative deepening for the time left.
+        time_limit : float (optional)
+            Seconds per move. If given, the search is deepened one by one
+            and the move of the last completed depth is returned.
+        ordering : bool
+            If True, candidates are ordered by `MoveOrdering`. Otherwise
+            they are searched in the order of squares.
+        incremental : bool
+            If True, the score is updated along the moves by
+            `IncrementalEvaluator`, instead of evaluated at the leaves.
+            Most nodes are leaves, so it costs about as much as it saves.
+        """
         self._EVAL_TBL = [
             # 1st evaluation table
             [
@@ -34,7 +74,22 @@ class Minmax:
         ]
 
         self._EXP2 = [pow(2, num) for num in range(64)]
+        self._evaluators = [WeightedSquares(table) for table in self._EVAL_TBL]
+        self.incremental = IncrementalEvaluator(self._evaluators) \
+            if incremental else None
         self._depth = depth
+        self._player_clr = None
+        self.table = TranspositionTable(memory) if memory else None
+        self.endgame = Endgame(endgame) if endgame else None
+        # OpeningBook, set by Strategy if a book file exists.
+        self.book = None
+        self.time_limit = time_limit
+        self.completed_depth = 0
+        self.nodes = 0
+        self.ordering = MoveOrdering()
+        self._order_moves = ordering
+        self._root_depth = depth
+        self._deadline = None
 
     def touch_border(self, black_board, white_board):
         board = (black_board | white_board)
@@ -43,25 +98,30 @@ class Minmax:
         return 0
 
     def evaluate_value(self, black_board, white_board):
-        evaluation = 0
-        board = [black_board, white_board]
-
         # If disk does not touch the border,
         # phase is False and TABLE[0] is called.
         phase = self.touch_border(black_board, white_board)
-        for position in range(64):
-            if (self._EXP2[position] & board[self._player_clr]):
-                evaluation += self._EVAL_TBL[phase][position]
-            if (self._EXP2[position] & board[self._player_clr ^ 1]):
-                evaluation -= self._EVAL_TBL[phase][position]
-        return evaluation
+        if self._player_clr:
+            return self._evaluators[phase](white_board, black_board)
+        return self._evaluators[phase](black_board, white_board)
+
+    def set_color(self, turn):
+        """Set the color to search for, as `put_disk` does by the turn.
+
+        Parameters
+        ----------
+        turn : int
+            Black is 0 and white is 1.
+        """
+        self._player_clr = turn
 
     def update_file(self):
         with open(self._filename, "wb") as file_:
             pickle.dump(self._hash_log, file_)
 
     def min_max(
-            self, black_board, white_board, turn, depth, pre_evaluation
+            self, black_board, white_board, turn, depth, pre_evaluation,
+            key=None,
             ):
         """Return wheather you can put disk or not.
 
@@ -71,11 +131,18 @@ class Minmax:
             64-bit intager.
         turn : int
             If black is on turn, 1. If white, 0.
+        key : int (optional)
+            Zobrist key of the position, carried along with the boards.
         """
-        # Calculate evaluation.
-        evaluation = self.evaluate_value(black_board, white_board)
+        self.nodes += 1
+        if self._deadline is not None \
+                and time.perf_counter() > self._deadline:
+            raise _Timeout
         if depth == 0:
-            return evaluation, 1
+            if self.incremental is None:
+                return self.evaluate_value(black_board, white_board), 1
+            # Same as evaluate_value, kept up to date along the moves.
+            return self.incremental.value(self._player_clr), 1
 
         if turn == self._player_clr:
             max_evaluation = -1 * float("inf")
@@ -86,52 +153,66 @@ class Minmax:
             turn, black_board, white_board
             )
 
-        candidates = []
-        for num in range(64):
-            if self._EXP2[num] & reversible:
-                candidates.append(num)
+        candidates = squares(reversible)
 
-        if self._othello.board.turn_playable(
-            turn, black_board, white_board
-        ):
-            for candidate in candidates:
+        # Shallow nodes are cheaper to search than to look up.
+        table = self.table if depth >= self.TABLE_DEPTH else None
+        first = None
+        if table is not None:
+            if key is None:
+                key = hash_board(black_board, white_board, turn)
+            found, first = self._probe(
+                key, turn, depth, reversible, pre_evaluation)
+            if found is not None:
+                return found
+
+        ply = self._root_depth - depth
+        candidates = self._order(candidates, ply, turn, first)
+
+        if reversible:
+            for index, candidate in enumerate(candidates):
                 new_black_board, new_white_board = \
                     self._othello.board.simulate_play(
                         turn, self._EXP2[candidate],
                         black_board, white_board,
                     )
-                count_black, count_white = self._othello.board.count_disks(
-                    new_black_board, new_white_board
-                )
-                if self._player_clr:
-                    count_player, count_opponent = count_black, count_white
-                else:
-                    count_player, count_opponent = count_white, count_black
-                if self._othello.judge_game([count_player, count_opponent]):
-                    if self._othello.result == "WIN":
-                        next_evaluation = 10000000000
-                    elif self._othello.result == "LOSE":
-                        next_evaluation = -10000000000
-                    else:
-                        next_evaluation = 0
+                # Reversed disks change in both boards.
+                reverse_bit = (black_board ^ new_black_board) \
+                    & (white_board ^ new_white_board)
+                new_key = \
+                    update_key(key, turn, candidate, reverse_bit) \
+                    if table is not None and depth > self.TABLE_DEPTH \
+                    else None
+                # judge_game of the game would also check the game on the
+                # display, which has a move to search, so only a full
+                # board ends the game here.
+                if not ~(new_black_board | new_white_board) \
+                        & 0xffffffffffffffff:
+                    next_evaluation = self.judge_full_board(
+                        new_black_board, new_white_board)
                 else:
-                    if turn == self._player_clr:
-                        next_evaluation = self.min_max(
-                            new_black_board, new_white_board,
-                            turn ^ 1, depth-1, max_evaluation,
-                            )[0]
-                    else:
-                        next_evaluation = self.min_max(
-                            new_black_board, new_white_board,
-                            turn ^ 1, depth-1, min_evaluation,
-                            )[0]
+                    next_evaluation = self._search_child(
+                        new_black_board, new_white_board, turn, depth,
+                        max_evaluation if turn == self._player_clr
+                        else min_evaluation,
+                        new_key, candidate, reverse_bit)
 
                 # alpha-bata method(pruning)
                 if turn == self._player_clr:
                     if next_evaluation > pre_evaluation:
+                        self.ordering.cutoff(
+                            candidate, index, ply, turn, depth)
+                        self._store(
+                            table, key, depth, TranspositionTable.LOWER,
+                            next_evaluation, candidate)
                         return pre_evaluation, candidate
                 else:
                     if pre_evaluation > next_evaluation:
+                        self.ordering.cutoff(
+                            candidate, index, ply, turn, depth)
+                        self._store(
+                            table, key, depth, TranspositionTable.UPPER,
+                            next_evaluation, candidate)
                         return pre_evaluation, candidate
 
                 if turn == self._player_clr:
@@ -143,25 +224,172 @@ class Minmax:
                         min_evaluation = next_evaluation
                         selected = candidate
         else:
+            if key is not None:
+                key = pass_key(key)
             if turn == self._player_clr:
                 return self.min_max(
                     black_board, white_board, turn^1, depth-1, max_evaluation,
+                    key,
                     )
             else:
                 return self.min_max(
                     black_board, white_board, turn^1, depth-1, min_evaluation,
+                    key,
                     )
         if turn == self._player_clr:
+            self._store(
+                table, key, depth, TranspositionTable.EXACT, max_evaluation,
+                selected)
             return max_evaluation, selected
         else:
+            self._store(
+                table, key, depth, TranspositionTable.EXACT, min_evaluation,
+                selected)
             return min_evaluation, selected
 
+    def _search_child(
+            self, black_board, white_board, turn, depth, pre_evaluation,
+            key, move, reverse_bit,
+            ):
+        """Return the evaluation of the position after a move of turn."""
+        if self.incremental is not None:
+            self.incremental.make(
+                turn, move, reverse_bit, black_board, white_board)
+        evaluation = self.min_max(
+            black_board, white_board, turn ^ 1, depth - 1, pre_evaluation,
+            key)[0]
+        if self.incremental is not None:
+            self.incremental.unmake()
+        return evaluation
+
+    def judge_full_board(self, black_board, white_board):
+        """Return the evaluation of a full board from the player's side."""
+        count_player = count(white_board if self._player_clr else black_board)
+        if count_player > 32:
+            return 10000000000
+        elif count_player < 32:
+            return -10000000000
+        return 0
+
+    def _probe(self, key, turn, depth, reversible, pre_evaluation):
+        """Look up the table for `min_max`.
+
+        Returns
+        -------
+        found : tuple or None
+            Evaluation and move to be returned, if the entry is enough.
+        first : int or None
+            Best move of the earlier search, to be searched first.
+        """
+        entry = self.table.probe(key)
+        if entry is None or not (reversible >> entry[3]) & 1:
+            return None, None
+        value, entry_depth, bound, move = entry
+        if entry_depth >= depth:
+            if bound == TranspositionTable.EXACT:
+                return (value, move), move
+            # The bound proves the same cut as the loop of min_max.
+            if turn == self._player_clr:
+                if bound == TranspositionTable.LOWER \
+                        and value > pre_evaluation:
+                    return (pre_evaluation, move), move
+            elif bound == TranspositionTable.UPPER \
+                    and pre_evaluation > value:
+                return (pre_evaluation, move), move
+        return None, move
+
+    @staticmethod
+    def _store(table, key, depth, bound, value, move):
+        """Save a result to the table, if the node uses it."""
+        if table is not None:
+            table.store(key, depth, bound, value, move)
+
+    def _order(self, candidates, ply, turn, first):
+        """Return the candidates in the order to be searched."""
+        if self._order_moves:
+            return self.ordering.order(candidates, ply, turn, first)
+        if first is not None:
+            candidates.remove(first)
+            candidates.insert(0, first)
+        return candidates
+
     def put_disk(self, othello):
         black_board, white_board = othello.board.return_board()
         turn = othello.turn
-        self._player_clr = turn
+        if self.book is not None:
+            move = self.book.lookup(
+                *othello.board.return_player_board(turn))[0]
+            if move is not None:
+                return move
+        deadline = None if self.time_limit is None \
+            else time.perf_counter() + self.time_limit
+        if self.endgame is not None \
+                and self.endgame.is_applicable(black_board, white_board):
+            try:
+                return self.endgame.put_disk(othello, deadline)
+            except _Timeout:
+                pass
+        if self.table is not None:
+            # Evaluations are from the player's side, so the table is
+            # valid only for the same color.
+            if self._player_clr != turn:
+                self.table.clear()
+            self.table.new_search()
+        self.set_color(turn)
         self._count_pass = 0
         self._othello = othello
+        self.nodes = 0
+        self.ordering.new_search()
+        if deadline is not None:
+            return self.iterative_deepening(
+                black_board, white_board, turn, deadline)
+        return self.search(black_board, white_board, turn, self._depth)[1]
+
+    def search(self, black_board, white_board, turn, depth):
+        """Search the root and return the evaluation and the best move."""
+        self._root_depth = depth
+        if self.incremental is not None:
+            self.incremental.reset(black_board, white_board)
         return self.min_max(
-            black_board, white_board, turn,
-            self._depth, pre_evaluation=float("inf"))[1]
+            black_board, white_board, turn, depth,
+            pre_evaluation=float("inf"))
+
+    def iterative_deepening(
+            self, black_board, white_board, turn, deadline=None,
+            ):
+        """Search depth 1, 2, 3... until the time limit is over.
+
+        The best moves of earlier iterations are left in the table, and
+        the killers and history of `MoveOrdering` are kept, so the deeper
+        iterations search them first.
+
+        Parameters
+        ----------
+        deadline : float (optional)
+            Time of `time.perf_counter` to stop at. Defaults to the time
+            limit from now.
+
+        Returns
+        -------
+        selected : int
+            Best move of the last completed depth.
+        """
+        if deadline is None:
+            deadline = time.perf_counter() + self.time_limit
+        selected = None
+        self.completed_depth = 0
+        for depth in range(1, self._depth + 1):
+            # The 1st iteration is always completed to have a move.
+            if selected is not None:
+                self._deadline = deadline
+            try:
+                selected = self.search(
+                    black_board, white_board, turn, depth)[1]
+            except _Timeout:
+                break
+            finally:
+                self._deadline = None
+            self.completed_depth = depth
+            if time.perf_counter() > deadline:
+                break
+        return selected
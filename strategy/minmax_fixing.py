@@ -4,30 +4,21 @@
 from collections import deque
 import copy
 import numpy as np
-import pickle
 import random
 
 from bitboard import OthelloGame
 
+from .search_cache import SearchCache
+
 
 class MinmaxNew:
     """Find a better move by min-max method.
     """
     __all__ = ["put_disk"]
 
-    def __init__(self, filename="./strategy/minmax_hash.pkl"):
+    def __init__(self, filename="./strategy/minmax_hash.bin"):
         self._filename = filename
-        try:
-            with open(filename, "rb") as file_:
-                self._hash_log = pickle.load(file_)
-        except FileNotFoundError:
-            self._hash_log = {}
-        for color in ["1", "0"]:
-            for turn in ["1", "0"]:
-                for depth in map(str, range(10)):
-                    key = "".join([color, turn, depth])
-                    if key not in self._hash_log.keys():
-                        self._hash_log[key] = {}
+        self._cache = SearchCache(filename)
 
         self._EVALUATION_FIRST = [
             30,  -12,   0,  -1,  -1,   0, -12,  30,
@@ -119,23 +110,27 @@ class MinmaxNew:
                     board_evaluation -= self._EVALUATION_MIDDLE[position]
         return board_evaluation
 
-    def check_hash_table(self, hashed_board, hash_key):
-        """Save board data which is deeper than 4."""
-        if hashed_board in self._hash_log[hash_key].keys():
-            return True, self._hash_log[hash_key][hashed_board]
-        return False, None
+    def check_hash_table(self, white_board, black_board, turn, depth):
+        """Look up board data saved by this or a former game."""
+        saved = self._cache.get(
+            black_board, white_board, turn, depth, self._player_clr)
+        if saved is None:
+            return False, None
+        return True, saved
 
     def save_hash_table(
-            self, hashed_board, hash_key, evaluation, selected, depth
+            self, white_board, black_board, turn, evaluation, selected, depth,
             ):
+        """Save board data which is deeper than 4."""
         if depth < 4:
             return
-        self._hash_log[hash_key][hashed_board] = (evaluation, selected)
+        self._cache.put(
+            black_board, white_board, turn, depth, evaluation, selected,
+            self._player_clr)
         return
 
     def update_file(self):
-        with open(self._filename, "wb") as file_:
-            pickle.dump(self._hash_log, file_)
+        self._cache.flush()
         return
 
     def move_ordering(
@@ -229,10 +224,8 @@ class MinmaxNew:
             ):
         # If the board is known, return value.
         # print("called, game turn = %d, depth = %d, pre = %f" %(turn, depth, pre_evaluation))
-        hashed_board = "".join([str(white_board), str(black_board)])
-        hash_key = "".join([str(self._player_clr) + str(turn) + str(depth)])
-
-        is_exist, saved = self.check_hash_table(hashed_board, hash_key)
+        is_exist, saved = self.check_hash_table(
+            white_board, black_board, turn, depth)
         if is_exist:
             evaluation, selected = saved
             # print("exist, evaluation = %d, selected = %d, depth = %d" %(evaluation, selected, depth))
@@ -350,13 +343,15 @@ class MinmaxNew:
         if turn == self._player_clr:
             if depth > 4:
                 self.save_hash_table(
-                    hashed_board, hash_key, max_evaluation, selected, depth)
+                    white_board, black_board, turn, max_evaluation, selected,
+                    depth)
             # print("final value = %f, selected = %d, game turn %d, depth = %d" %(max_evaluation, selected, turn, depth))
             return max_evaluation, selected
         else:
             if depth > 4:
                 self.save_hash_table(
-                    hashed_board, hash_key, min_evaluation, selected, depth)
+                    white_board, black_board, turn, min_evaluation, selected,
+                    depth)
             # print("final value = %f, selected = %d, game turn %d, depth = %d" %(min_evaluation, selected, turn, depth))
             return min_evaluation, selected
 
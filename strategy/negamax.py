@@ -0,0 +1,235 @@
+"""A strategy to search by negamax alpha-beta with principal variations."""
+
+import time
+
+from bitboard.core import count, flip, moves
+from bitboard.zobrist import hash_board, pass_key, update_key
+
+from .minmax import Minmax, _Timeout
+from .transposition import TranspositionTable
+
+
+class Negamax(Minmax):
+    """Find a better move by negamax alpha-beta method.
+
+    Every node is searched with the full (alpha, beta) window from the side
+    to move, and returns fail-soft values. With `pvs`, moves after the first
+    are searched with a null window and searched again only if they can be
+    better than the first one (principal variation search).
+
+    Parameters
+    ----------
+    depth, memory, endgame, time_limit, ordering, incremental
+        Same as `Minmax`.
+    pvs : bool
+        If False, every move is searched with the full window.
+    evaluator : callable (optional)
+        Function of (player, opponent) which returns the evaluation of the
+        side to move, e.g. `PatternEvaluator` with trained weights, with
+        which incremental is ignored. If None, the weighted squares of
+        `Minmax` are used.
+
+    Notes
+    -----
+    Scores are intagers, since the null window of the principal variation
+    search is (alpha, alpha + 1). The values of `evaluator` are rounded, so
+    it should be scaled to make 1 the smallest difference which matters.
+    """
+
+    __all__ = ["put_disk"]
+
+    WIN_VALUE = 10000000000
+
+    def __init__(
+            self, depth=4, memory=0, endgame=0, time_limit=None,
+            ordering=True, pvs=True, evaluator=None, incremental=False,
+            ):
+        super().__init__(
+            depth, memory, endgame, time_limit, ordering,
+            incremental and evaluator is None)
+        self.pvs = pvs
+        self.evaluator = evaluator
+
+    def evaluate(self, player, opponent):
+        """Return the evaluation of the side to move from scratch."""
+        return self._evaluators[self.touch_border(player, opponent)](
+            player, opponent)
+
+    def min_max(
+            self, black_board, white_board, turn, depth, pre_evaluation,
+            key=None,
+            ):
+        """Search the root by `negamax`, as `Minmax.search` calls.
+
+        `pre_evaluation` is not used, since the root is searched with the
+        full window.
+        """
+        if turn:
+            player, opponent = white_board, black_board
+        else:
+            player, opponent = black_board, white_board
+        return self.negamax(
+            player, opponent, turn, depth,
+            -Negamax.WIN_VALUE - 1, Negamax.WIN_VALUE + 1, key)
+
+    def negamax(self, player, opponent, turn, depth, alpha, beta, key=None):
+        """Return the evaluation and the best move of the side to move.
+
+        Parameters
+        ----------
+        player, opponent : int
+            64-bit intager of the side to move and the other.
+        turn : int
+            Color of player. Black is 0 and white is 1.
+        depth : int
+            Remaining depth.
+        alpha, beta : int
+            Search window. The returned value may be outside of it.
+        key : int (optional)
+            Zobrist key of the position.
+
+        Returns
+        -------
+        evaluation : int
+        move : int or None
+            None if player must pass or the depth is 0.
+        """
+        self.nodes += 1
+        if self._deadline is not None \
+                and time.perf_counter() > self._deadline:
+            raise _Timeout
+        if depth == 0:
+            return self.evaluate_leaf(player, opponent, turn), None
+
+        reversible = moves(player, opponent)
+        if not reversible:
+            if not moves(opponent, player):
+                score = count(player) - count(opponent)
+                if score > 0:
+                    return Negamax.WIN_VALUE, None
+                elif score < 0:
+                    return -Negamax.WIN_VALUE, None
+                return 0, None
+            if key is not None:
+                key = pass_key(key)
+            return -self.negamax(
+                opponent, player, turn ^ 1, depth - 1, -beta, -alpha,
+                key)[0], None
+
+        candidates = []
+        while reversible:
+            low = reversible & -reversible
+            reversible ^= low
+            candidates.append(low.bit_length() - 1)
+
+        # Shallow nodes are cheaper to search than to look up.
+        table = self.table if depth >= self.TABLE_DEPTH else None
+        first = None
+        if table is not None:
+            if key is None:
+                key = hash_board(
+                    *((opponent, player) if turn else (player, opponent)),
+                    turn)
+            found, first = self._probe_window(
+                key, depth, alpha, beta, candidates)
+            if found is not None:
+                return found
+
+        ply = self._root_depth - depth
+        candidates = self._order(candidates, ply, turn, first)
+        best_evaluation, selected = self._search_moves(
+            player, opponent, turn, depth, alpha, beta,
+            key if table is not None and depth > self.TABLE_DEPTH else None,
+            candidates, ply)
+
+        if table is not None:
+            if best_evaluation >= beta:
+                bound = table.LOWER
+            elif best_evaluation <= alpha:
+                bound = table.UPPER
+            else:
+                bound = table.EXACT
+            table.store(key, depth, bound, best_evaluation, selected)
+        return best_evaluation, selected
+
+    def evaluate_leaf(self, player, opponent, turn):
+        """Return the evaluation of the side to move at depth 0."""
+        if self.evaluator is not None:
+            return round(self.evaluator(player, opponent))
+        if self.incremental is None:
+            return self.evaluate(player, opponent)
+        # Same as evaluate, kept up to date along the moves.
+        return self.incremental.value(turn)
+
+    def _probe_window(self, key, depth, alpha, beta, candidates):
+        """Look up the table for `negamax`.
+
+        Returns
+        -------
+        found : tuple or None
+            Evaluation and move to be returned, if the entry is enough.
+        first : int or None
+            Best move of the earlier search, to be searched first.
+        """
+        entry = self.table.probe(key)
+        if entry is None or entry[3] not in candidates:
+            return None, None
+        value, entry_depth, bound, move = entry
+        if entry_depth >= depth:
+            if bound == TranspositionTable.EXACT \
+                    or bound == TranspositionTable.LOWER and value >= beta \
+                    or bound == TranspositionTable.UPPER and value <= alpha:
+                return (value, move), move
+        # Search the best move of the earlier search first.
+        return None, move
+
+    def _search_moves(
+            self, player, opponent, turn, depth, alpha, beta, key,
+            candidates, ply,
+            ):
+        """Search the candidates in order and return the best of them.
+
+        key is of the position, or None if the children are not looked up
+        in the table.
+        """
+        best_evaluation = -Negamax.WIN_VALUE - 1
+        selected = candidates[0]
+        for index, candidate in enumerate(candidates):
+            reverse_bit = flip(player, opponent, candidate)
+            next_player = opponent ^ reverse_bit
+            next_opponent = player ^ reverse_bit ^ (1 << candidate)
+            new_key = None if key is None \
+                else update_key(key, turn, candidate, reverse_bit)
+
+            if self.incremental is not None:
+                self.incremental.make(
+                    turn, candidate, reverse_bit,
+                    *((next_player, next_opponent) if turn
+                      else (next_opponent, next_player)))
+            if index and self.pvs:
+                # Prove that the move is not better than alpha. Nothing is
+                # between alpha and alpha + 1, as scores are intagers.
+                evaluation = -self.negamax(
+                    next_player, next_opponent, turn ^ 1, depth - 1,
+                    -alpha - 1, -alpha, new_key)[0]
+                if alpha < evaluation < beta:
+                    evaluation = -self.negamax(
+                        next_player, next_opponent, turn ^ 1, depth - 1,
+                        -beta, -evaluation, new_key)[0]
+            else:
+                evaluation = -self.negamax(
+                    next_player, next_opponent, turn ^ 1, depth - 1,
+                    -beta, -alpha, new_key)[0]
+            if self.incremental is not None:
+                self.incremental.unmake()
+
+            if evaluation > best_evaluation:
+                best_evaluation = evaluation
+                selected = candidate
+                if evaluation > alpha:
+                    alpha = evaluation
+                    if alpha >= beta:
+                        self.ordering.cutoff(
+                            candidate, index, ply, turn, depth)
+                        break
+        return best_evaluation, selected
@@ -0,0 +1,108 @@
+"""Move ordering shared by the alpha-beta strategies."""
+
+
+class MoveOrdering:
+    """Order candidates by killer moves, history and a static prior.
+
+    Killer moves are the last 2 moves which caused a cutoff at the same ply.
+    History is the sum of depth ** 2 of cutoffs by each square and color.
+    The static prior prefers corners and avoids X-squares and C-squares.
+    """
+
+    __all__ = ["order", "cutoff", "new_search", "clear", "stats"]
+
+    MAX_PLY = 128
+    KILLER_BONUS = 1 << 30
+    PRIOR = [
+        8, -4, 2, 1, 1, 2, -4, 8,
+        -4, -8, -1, -1, -1, -1, -8, -4,
+        2, -1, 1, 0, 0, 1, -1, 2,
+        1, -1, 0, 0, 0, 0, -1, 1,
+        1, -1, 0, 0, 0, 0, -1, 1,
+        2, -1, 1, 0, 0, 1, -1, 2,
+        -4, -8, -1, -1, -1, -1, -8, -4,
+        8, -4, 2, 1, 1, 2, -4, 8,
+    ]
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # killers[ply] and history[color][square]
+        self.killers = [[None, None] for _ in range(MoveOrdering.MAX_PLY)]
+        self.history = [[0] * 64 for _ in range(2)]
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+
+    def new_search(self):
+        """Forget killers and age the history for the next move."""
+        for killer in self.killers:
+            killer[0] = killer[1] = None
+        for history in self.history:
+            for num in range(64):
+                history[num] >>= 1
+
+    def order(self, candidates, ply: int, turn: int, first: int = None):
+        """Return candidates in the order to be searched.
+
+        Parameters
+        ----------
+        candidates : list of int
+            Integers from 0 to 63.
+        ply : int
+            Distance from the root.
+        turn : int
+            Color to move. Black is 0 and white is 1.
+        first : int (optional)
+            Move searched first regardless of the scores, e.g. the move of
+            the transposition table.
+        """
+        history = self.history[turn]
+        prior = MoveOrdering.PRIOR
+        scores = [(history[num] + prior[num], num) for num in candidates]
+        if ply < MoveOrdering.MAX_PLY:
+            killers = self.killers[ply]
+            scores = [
+                (score + MoveOrdering.KILLER_BONUS, num)
+                if num == killers[0] or num == killers[1] else (score, num)
+                for score, num in scores
+            ]
+        scores.sort(reverse=True)
+        ordered = [num for _, num in scores]
+        if first is not None:
+            ordered.remove(first)
+            ordered.insert(0, first)
+        return ordered
+
+    def cutoff(self, move: int, index: int, ply: int, turn: int, depth: int):
+        """Record a move which caused a cutoff.
+
+        Parameters
+        ----------
+        move : int
+            Integer from 0 to 63.
+        index : int
+            Order of the move in the searched candidates.
+        ply, turn : int
+            Same as `order`.
+        depth : int
+            Remaining depth of the node.
+        """
+        self.cutoffs += 1
+        if not index:
+            self.first_cutoffs += 1
+        self.history[turn][move] += depth * depth
+        if ply < MoveOrdering.MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+
+    def stats(self):
+        """Return the number of cutoffs and the ratio by the first move."""
+        return {
+            "cutoffs": self.cutoffs,
+            "first_cutoffs": self.first_cutoffs,
+            "first_cutoff_rate":
+                self.first_cutoffs / self.cutoffs if self.cutoffs else 0.,
+        }
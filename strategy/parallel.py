@@ -0,0 +1,252 @@
+"""A strategy to split the root of the search across processes."""
+
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+import atexit
+from itertools import count as counter
+from logging import getLogger
+import multiprocessing
+import time
+
+from bitboard.core import flip, moves
+from bitboard.zobrist import hash_board, update_key
+
+from .minmax import _Timeout
+from .negamax import Negamax
+from .shared_table import SharedTranspositionTable
+
+logger = getLogger(__name__)
+
+# Pools by the number of workers: (executor, alpha, stop).
+_POOLS = {}
+_search_ids = counter(1)
+
+# State of a worker process.
+_shared = {}
+_searches = {}
+
+
+def _init_worker(alpha, stop):
+    _shared["alpha"] = alpha
+    _shared["stop"] = stop
+
+
+def get_pool(workers: int):
+    """Return the persistent pool of the number of workers.
+
+    Returns
+    -------
+    executor : concurrent.futures.ProcessPoolExecutor
+    alpha : multiprocessing.sharedctypes.RawValue
+        Best value of the root, raised by the main process.
+    stop : multiprocessing.sharedctypes.RawValue
+        Id of the search to be stopped.
+    """
+    if workers not in _POOLS:
+        alpha = multiprocessing.RawValue("q", 0)
+        stop = multiprocessing.RawValue("q", 0)
+        executor = ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(alpha, stop))
+        _POOLS[workers] = (executor, alpha, stop)
+        logger.info("Search pool of %d workers was started." % workers)
+    return _POOLS[workers]
+
+
+def shutdown_pools():
+    """Shut down all the pools, which is also done at exit."""
+    while _POOLS:
+        executor, _, _ = _POOLS.popitem()[1]
+        executor.shutdown(wait=True)
+
+
+atexit.register(shutdown_pools)
+
+
+class _WorkerSearch(Negamax):
+    """Negamax which stops when the main process asks."""
+
+    STOP_INTERVAL = 0xff
+
+    def __init__(self, memory, ordering, pvs, table_name):
+        # The table of the base class would be replaced by the shared one.
+        super().__init__(0, 0, 0, None, ordering, pvs)
+        if table_name is not None:
+            self.table = SharedTranspositionTable(name=table_name)
+        self.search_id = 0
+
+    def close(self):
+        """Detach the shared table."""
+        if self.table is not None:
+            self.table.close()
+
+    def negamax(self, player, opponent, turn, depth, alpha, beta, key=None):
+        if not self.nodes & _WorkerSearch.STOP_INTERVAL \
+                and _shared["stop"].value == self.search_id:
+            raise _Timeout
+        return super().negamax(
+            player, opponent, turn, depth, alpha, beta, key)
+
+
+def _search_move(
+        config, search_id, move, player, opponent, turn, depth, time_left,
+        ):
+    """Search a root move in a worker.
+
+    The move is first proved not better than the shared alpha by a null
+    window, and searched with the full window only if it is better.
+    player, opponent and turn are of the root.
+
+    Returns
+    -------
+    move : int
+    value : int or None
+        Value of the move from the root, or None if it was stopped.
+    nodes : int
+    """
+    if config not in _searches:
+        # Searches of other tables belong to closed or former strategies,
+        # and keeping them would keep their shared blocks mapped.
+        for old in [old for old in _searches if old[3] != config[3]]:
+            _searches.pop(old).close()
+        _searches[config] = _WorkerSearch(*config)
+    search = _searches[config]
+    search.search_id = search_id
+    search.nodes = 0
+    search._root_depth = depth + 1
+    search._deadline = \
+        None if time_left is None else time.perf_counter() + time_left
+    reverse_bit = flip(player, opponent, move)
+    player, opponent = \
+        opponent ^ reverse_bit, player ^ reverse_bit ^ (1 << move)
+    if search.incremental is not None:
+        search.incremental.reset(
+            *((player, opponent) if turn else (opponent, player)))
+    try:
+        alpha = _shared["alpha"].value
+        value = -search.negamax(
+            player, opponent, turn ^ 1, depth, -alpha - 1, -alpha)[0]
+        if value > alpha:
+            alpha = max(alpha, _shared["alpha"].value)
+            value = -search.negamax(
+                player, opponent, turn ^ 1, depth,
+                -Negamax.WIN_VALUE - 1, -alpha)[0]
+    except _Timeout:
+        value = None
+    finally:
+        search._deadline = None
+    return move, value, search.nodes
+
+
+class ParallelSearch(Negamax):
+    """Split the root moves of the negamax search across processes.
+
+    The first root move is searched here to have an alpha. The others are
+    searched by a persistent pool of worker processes, which read the best
+    value so far from shared memory. When a move wins, or the time limit is
+    over, the remaining searches are cancelled. The transposition table is
+    a `SharedTranspositionTable`, which all the workers read and write.
+
+    Parameters
+    ----------
+    depth, memory, endgame, time_limit, ordering, pvs
+        Same as `Negamax`.
+    workers : int
+        Number of worker processes. With less than 2, the root is searched
+        here as `Negamax` does.
+    """
+
+    __all__ = ["put_disk"]
+
+    def __init__(
+            self, depth=4, memory=4 << 20, endgame=0, time_limit=None,
+            ordering=True, pvs=True, workers=4,
+            ):
+        super().__init__(depth, memory, endgame, time_limit, ordering, pvs)
+        self.workers = workers
+        if memory:
+            self.table = SharedTranspositionTable(memory)
+            self._config = (memory, ordering, pvs, self.table.name)
+        else:
+            self._config = (memory, ordering, pvs, None)
+
+    def close(self):
+        """Release the shared table, which is also done at exit."""
+        if self.table is not None:
+            self.table.close()
+
+    def search(self, black_board, white_board, turn, depth):
+        """Search the root and return the evaluation and the best move."""
+        if depth < 2 or self.workers < 2:
+            return super().search(black_board, white_board, turn, depth)
+        self._root_depth = depth
+        if self.incremental is not None:
+            self.incremental.reset(black_board, white_board)
+        if turn:
+            player, opponent = white_board, black_board
+        else:
+            player, opponent = black_board, white_board
+        reversible = moves(player, opponent)
+        candidates = [num for num in range(64) if (reversible >> num) & 1]
+        first = None
+        if self.table is not None:
+            key = hash_board(black_board, white_board, turn)
+            entry = self.table.probe(key)
+            if entry is not None and entry[3] in candidates:
+                first = entry[3]
+        candidates = self.ordering.order(candidates, 0, turn, first)
+
+        # The eldest brother gives the alpha to the others.
+        move = candidates[0]
+        reverse_bit = flip(player, opponent, move)
+        if self.incremental is not None:
+            self.incremental.make(
+                turn, move, reverse_bit,
+                *((opponent ^ reverse_bit, player ^ reverse_bit ^ (1 << move))
+                  if turn else
+                  (player ^ reverse_bit ^ (1 << move),
+                   opponent ^ reverse_bit)))
+        new_key = None if self.table is None \
+            else update_key(key, turn, move, reverse_bit)
+        alpha = -self.negamax(
+            opponent ^ reverse_bit, player ^ reverse_bit ^ (1 << move),
+            turn ^ 1, depth - 1,
+            -Negamax.WIN_VALUE - 1, Negamax.WIN_VALUE + 1, new_key)[0]
+        if self.incremental is not None:
+            self.incremental.unmake()
+        selected = move
+        if len(candidates) == 1 or alpha >= Negamax.WIN_VALUE:
+            return alpha, selected
+
+        executor, shared_alpha, stop = get_pool(self.workers)
+        search_id = next(_search_ids)
+        shared_alpha.value = alpha
+        if self._deadline is None:
+            time_left = None
+        else:
+            time_left = self._deadline - time.perf_counter()
+            if time_left <= 0:
+                raise _Timeout
+        futures = [
+            executor.submit(
+                _search_move, self._config, search_id, move,
+                player, opponent, turn, depth - 1, time_left)
+            for move in candidates[1:]
+        ]
+        try:
+            for future in as_completed(futures, timeout=time_left):
+                move, value, nodes = future.result()
+                self.nodes += nodes
+                if value is None:
+                    raise _Timeout
+                if value > alpha:
+                    alpha, selected = value, move
+                    shared_alpha.value = alpha
+                    if alpha >= Negamax.WIN_VALUE:
+                        break
+        except TimeoutError:
+            raise _Timeout
+        finally:
+            # Searches left are no longer needed.
+            stop.value = search_id
+            for future in futures:
+                future.cancel()
+        return alpha, selected
@@ -0,0 +1,281 @@
+"""Evaluate positions by the weights of disk patterns.
+
+Each pattern is a list of squares, and it is applied to every position
+given by the 8 symmetries of the board. The disks on an instance are read
+as a base-3 number (0 empty, 1 player, 2 opponent), which indexes the
+weights of the pattern in the stage of the game.
+
+Evaluations are intagers in 1/SCALE units of the weights, which are
+scaled once when they are set, so nothing is rounded per evaluation.
+
+No trained weights are shipped, so the evaluator is not one of the
+strategies of `Strategy`. It is given to `Negamax` as its evaluator with
+weights trained and saved to WEIGHT_FILE, which `load_weights` reads.
+"""
+
+from array import array
+from logging import getLogger
+import os
+
+import numpy as np
+
+from bitboard import batch
+from bitboard.core import count
+from bitboard.symmetry import transform_square
+
+logger = getLogger(__name__)
+
+WEIGHT_FILE = os.path.join(os.path.dirname(__file__), "pattern_weights.bin")
+_MAGIC = b"RVPW\x02"
+
+# Squares of the patterns, in the order of base-3 digits.
+PATTERNS = {
+    "edge+2x": [0, 1, 2, 3, 4, 5, 6, 7, 9, 14],
+    "corner3x3": [0, 1, 2, 8, 9, 10, 16, 17, 18],
+    "corner2x5": [0, 1, 2, 3, 4, 8, 9, 10, 11, 12],
+    "diagonal8": [0, 9, 18, 27, 36, 45, 54, 63],
+    "diagonal7": [1, 10, 19, 28, 37, 46, 55],
+    "diagonal6": [2, 11, 20, 29, 38, 47],
+    "diagonal5": [3, 12, 21, 30, 39],
+    "diagonal4": [4, 13, 22, 31],
+    "line2": [8, 9, 10, 11, 12, 13, 14, 15],
+    "line3": [16, 17, 18, 19, 20, 21, 22, 23],
+    "line4": [24, 25, 26, 27, 28, 29, 30, 31],
+}
+
+
+def _instances(squares):
+    """Return the distinct images of a pattern by the 8 symmetries."""
+    instances = []
+    seen = set()
+    for symmetry in range(8):
+        instance = [transform_square(square, symmetry) for square in squares]
+        if frozenset(instance) not in seen:
+            seen.add(frozenset(instance))
+            instances.append(instance)
+    return instances
+
+
+def _build_index_tables():
+    """Return the lookups to compute base-3 indices from row bytes.
+
+    Returns
+    -------
+    row_table : numpy.ndarray
+        row_table[part, byte] is the part of the index given by the disks
+        of one row of one instance.
+    part_row : numpy.ndarray
+        Row of each part.
+    starts : numpy.ndarray
+        First part of each instance.
+    offsets : numpy.ndarray
+        First weight of the pattern of each instance.
+    """
+    row_table, part_row, starts, offsets = [], [], [], []
+    offset = 0
+    for squares in PATTERNS.values():
+        for instance in _instances(squares):
+            starts.append(len(part_row))
+            offsets.append(offset)
+            for row in sorted({square // 8 for square in instance}):
+                values = []
+                for byte in range(256):
+                    values.append(sum(
+                        pow(3, digit)
+                        for digit, square in enumerate(instance)
+                        if square // 8 == row and (byte >> (square % 8)) & 1
+                    ))
+                row_table.append(values)
+                part_row.append(row)
+        offset += pow(3, len(squares))
+    return (
+        np.array(row_table, dtype=np.intp),
+        np.array(part_row, dtype=np.intp),
+        np.array(starts, dtype=np.intp),
+        np.array(offsets, dtype=np.intp),
+    )
+
+
+_ROW_TABLE, _PART_ROW, _STARTS, _OFFSETS = _build_index_tables()
+_PARTS = np.arange(len(_PART_ROW))
+_ROW_SHIFTS = np.arange(0, 64, 8, dtype=np.uint64)
+
+# The same tables as plain ints for a single position:
+# (offset, ((row, part of player, part of opponent), ...)) of instances.
+_INSTANCES = tuple(
+    (int(offset), tuple(
+        (int(_PART_ROW[part]),
+         _ROW_TABLE[part].tolist(), (2 * _ROW_TABLE[part]).tolist())
+        for part in range(start, end)))
+    for start, end, offset in zip(
+        _STARTS, list(_STARTS[1:]) + [len(_PART_ROW)], _OFFSETS))
+
+
+class PatternEvaluator:
+    """Sum of the weights of the patterns on a board.
+
+    Parameters
+    ----------
+    weights : numpy.ndarray
+        Weights of shape (STAGES, number of weights). The weights of the
+        patterns are concatenated in the order of `PATTERNS`. They are
+        kept to 1/SCALE.
+    """
+
+    __all__ = [
+        "evaluate", "evaluate_batch", "indices", "save", "load",
+        "from_square_weights",
+    ]
+
+    STAGES = 15
+    SCALE = 256
+    SIZE = sum(pow(3, len(squares)) for squares in PATTERNS.values())
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float32)
+        if weights.shape != (PatternEvaluator.STAGES, PatternEvaluator.SIZE):
+            raise ValueError("Shape of weights is %s." % (weights.shape,))
+        self._scaled = np.rint(
+            weights * PatternEvaluator.SCALE).astype(np.int32)
+        self.weights = \
+            (self._scaled / PatternEvaluator.SCALE).astype(np.float32)
+        # Flat weights of each stage, indexed without numpy.
+        self._stages = [array("i", stage.tolist()) for stage in self._scaled]
+
+    @staticmethod
+    def stage(disks):
+        """Return the stage of the game from the number of disks."""
+        return np.minimum(
+            (np.asarray(disks) - 4) // 4, PatternEvaluator.STAGES - 1)
+
+    @staticmethod
+    def indices(player, opponent):
+        """Return the index of the weight of every pattern instance.
+
+        Parameters
+        ----------
+        player, opponent : numpy.ndarray of uint64
+            Boards of shape (n,).
+
+        Returns
+        -------
+        indices : numpy.ndarray
+            Array of shape (n, number of instances).
+        """
+        player_rows = ((player[:, None] >> _ROW_SHIFTS) & 0xff).astype(np.intp)
+        opponent_rows = \
+            ((opponent[:, None] >> _ROW_SHIFTS) & 0xff).astype(np.intp)
+        parts = _ROW_TABLE[_PARTS, player_rows[:, _PART_ROW]] \
+            + 2 * _ROW_TABLE[_PARTS, opponent_rows[:, _PART_ROW]]
+        return np.add.reduceat(parts, _STARTS, axis=1) + _OFFSETS
+
+    def evaluate_batch(self, player, opponent):
+        """Return the evaluations of player in many positions.
+
+        Parameters
+        ----------
+        player, opponent : array_like of uint64
+            Boards of shape (n,).
+
+        Returns
+        -------
+        evaluations : numpy.ndarray of int
+            Evaluations in 1/SCALE units of the weights.
+        """
+        player = np.asarray(player, dtype=np.uint64)
+        opponent = np.asarray(opponent, dtype=np.uint64)
+        stage = self.stage(batch.count(player | opponent))
+        return self._scaled[
+            stage[:, None], self.indices(player, opponent)].sum(
+                axis=1, dtype=np.int64)
+
+    def evaluate(self, player: int, opponent: int):
+        """Return the evaluation of player, as `evaluate_batch` does.
+
+        Searches evaluate one position at a time, so this is computed by
+        plain intagers without numpy.
+        """
+        weights = self._stages[min(
+            (count(player | opponent) - 4) >> 2, PatternEvaluator.STAGES - 1)]
+        player_rows = [(player >> shift) & 0xff for shift in range(0, 64, 8)]
+        opponent_rows = \
+            [(opponent >> shift) & 0xff for shift in range(0, 64, 8)]
+        total = 0
+        for index, parts in _INSTANCES:
+            for row, player_part, opponent_part in parts:
+                index += player_part[player_rows[row]] \
+                    + opponent_part[opponent_rows[row]]
+            total += weights[index]
+        return total
+
+    def __call__(self, player: int, opponent: int):
+        return self.evaluate(player, opponent)
+
+    @classmethod
+    def from_square_weights(cls, table):
+        """Return an evaluator equal to a symmetric table of 64 weights.
+
+        The weight of a square is split among the instances on it, so the
+        evaluation is the same as `WeightedSquares` in every stage. It is
+        a starting point before weights are trained.
+        """
+        cover = [0] * 64
+        for squares in PATTERNS.values():
+            for instance in _instances(squares):
+                for square in instance:
+                    cover[square] += 1
+        weights = []
+        for squares in PATTERNS.values():
+            digits = (
+                np.arange(pow(3, len(squares)))[:, None]
+                // pow(3, np.arange(len(squares)))) % 3
+            share = np.array(
+                [table[square] / cover[square] for square in squares])
+            weights.append(((digits == 1) * 1. - (digits == 2)) @ share)
+        weights = np.concatenate(weights)
+        return cls(np.tile(weights, (PatternEvaluator.STAGES, 1)))
+
+    def save(self, filename=WEIGHT_FILE):
+        """Save the weights to a binary file, as intagers of 1/SCALE."""
+        with open(filename, "wb") as file_:
+            file_.write(_MAGIC)
+            file_.write(_header())
+            file_.write(self._scaled.astype("<i4").tobytes())
+
+    @classmethod
+    def load(cls, filename=WEIGHT_FILE):
+        """Load the weights saved by `save`.
+
+        Raises
+        ------
+        ValueError
+            If the file is not of the current patterns and stages.
+        """
+        with open(filename, "rb") as file_:
+            data = file_.read()
+        header = _header()
+        start = len(_MAGIC) + len(header)
+        if data[:len(_MAGIC)] != _MAGIC or data[len(_MAGIC):start] != header:
+            raise ValueError("%s is not a file of the patterns." % filename)
+        scaled = np.frombuffer(data, dtype="<i4", offset=start)
+        if len(scaled) != PatternEvaluator.STAGES * PatternEvaluator.SIZE:
+            raise ValueError("%s is broken." % filename)
+        logger.info("Pattern weights were loaded from %s." % filename)
+        return cls(scaled.reshape(
+            PatternEvaluator.STAGES, PatternEvaluator.SIZE)
+            / np.float32(PatternEvaluator.SCALE))
+
+
+def _header():
+    """Return the header of a weight file of the current patterns."""
+    return np.array(
+        [PatternEvaluator.STAGES, PatternEvaluator.SCALE, len(PATTERNS)]
+        + [len(squares) for squares in PATTERNS.values()],
+        dtype="<u4").tobytes()
+
+
+def load_weights(filename=WEIGHT_FILE):
+    """Return the evaluator of the file, or None if there is no file."""
+    if not os.path.exists(filename):
+        return None
+    return PatternEvaluator.load(filename)
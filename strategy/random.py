@@ -2,6 +2,11 @@
 
 import random
 
+import numpy as np
+
+from bitboard import batch
+from bitboard.core import squares
+
 
 class Random:
     """Put disk randomly."""
@@ -10,8 +15,23 @@ class Random:
 
     def put_disk(self, othello):
         """Put disk randomly."""
-        candidates = []
-        for num in range(64):
-            if (pow(2, num)) & othello.reversible:
-                candidates.append(num)
+        candidates = squares(othello.reversible)
         return random.choice(candidates)
+
+    def put_disks(self, player, opponent, reversible, rng):
+        """Put disks randomly in a batch of games.
+
+        Parameters
+        ----------
+        player, opponent, reversible : numpy.ndarray of uint64
+            Boards of the games, all of which have a reversible position.
+        rng : numpy.random.RandomState
+
+        Returns
+        -------
+        put_loc : numpy.ndarray of int
+            Integers from 0 to 63.
+        """
+        legal = batch.bits(reversible)
+        score = np.where(legal, rng.random_sample(legal.shape), -1.)
+        return score.argmax(axis=1)
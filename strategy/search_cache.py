@@ -0,0 +1,237 @@
+"""A persistent cache of search results in a file of fixed-width records.
+
+The file is a header, records sorted by position, and records appended
+since the last compaction.
+    header : magic (8 bytes), number of sorted records (uint64),
+             generation (uint64)
+    record : black, white (uint64), value (float64), move (int8),
+             depth, flags (turn | color << 1), generation (uint8),
+             padding (4 bytes)
+A record appended later replaces the one of the same position.
+"""
+
+from logging import getLogger
+import mmap
+import os
+import struct
+
+logger = getLogger(__name__)
+
+_MAGIC = b"RVSC\x01\x00\x00\x00"
+_HEADER = struct.Struct("<8sQQ")
+_RECORD = struct.Struct("<QQdbBBB4x")
+
+
+class SearchCache:
+    """Store search results of positions across runs.
+
+    The sorted records are mapped on the first lookup and searched by
+    bisection, so opening a cache costs nothing however large it is. New
+    records are appended to the file, and merged into the sorted records
+    by `compact` when there are many of them. If there are more records
+    than max_records, the shallowest and oldest ones are evicted.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the cache file, created if it does not exist.
+    max_records : int
+        Number of records kept by compaction.
+    compact_ratio : float
+        `flush` compacts the file when the appended records are more than
+        this ratio of the sorted ones.
+    """
+
+    __all__ = ["get", "put", "flush", "compact", "close"]
+
+    MIN_COMPACT = 4096
+
+    def __init__(
+            self, filename: str, max_records: int = 1 << 20,
+            compact_ratio: float = 0.25,
+            ):
+        self.filename = filename
+        self.max_records = max_records
+        self.compact_ratio = compact_ratio
+        self._file = None
+        self._map = None
+        self._size = 0
+        self._generation = 0
+        self._appended = {}
+        self._pending = []
+        self._opened = False
+
+        # Counters.
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        self._open()
+        return self._size + len(self._appended)
+
+    @staticmethod
+    def _position(black, white, turn, depth, color):
+        return black, white, turn | color << 1, depth
+
+    def _open(self):
+        """Map the file, and read the records appended to it."""
+        if self._opened:
+            return
+        self._opened = True
+        if not os.path.exists(self.filename) \
+                or os.path.getsize(self.filename) < _HEADER.size:
+            with open(self.filename, "wb") as file_:
+                file_.write(_HEADER.pack(_MAGIC, 0, 0))
+        self._file = open(self.filename, "r+b")
+        magic, size, generation = _HEADER.unpack(
+            self._file.read(_HEADER.size))
+        end = _HEADER.size + size * _RECORD.size
+        length = os.fstat(self._file.fileno()).st_size
+        if magic != _MAGIC or length < end:
+            self.close()
+            raise ValueError("%s is not a search cache." % self.filename)
+        appended = (length - end) // _RECORD.size
+        if end + appended * _RECORD.size != length:
+            # A record cut by a crash would misalign the records after it.
+            logger.warning(
+                "A broken record was dropped from %s." % self.filename)
+            self._file.truncate(end + appended * _RECORD.size)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._size = size
+        self._generation = generation
+        for offset in range(end, end + appended * _RECORD.size, _RECORD.size):
+            black, white, value, move, depth, flags, generation = \
+                _RECORD.unpack_from(self._map, offset)
+            self._appended[black, white, flags, depth] = \
+                (value, move, generation)
+
+    def _find(self, position):
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            record = _RECORD.unpack_from(
+                self._map, _HEADER.size + middle * _RECORD.size)
+            found = (record[0], record[1], record[5], record[4])
+            if found < position:
+                low = middle + 1
+            elif found > position:
+                high = middle
+            else:
+                return record[2], record[3]
+        return None
+
+    def get(
+            self, black: int, white: int, turn: int, depth: int,
+            color: int = 0,
+            ):
+        """Look up a search result.
+
+        Parameters
+        ----------
+        black, white : int
+            64-bit intager.
+        turn : int
+            Side to move.
+        depth : int
+            Searched depth.
+        color : int
+            Color of the searching player, for searches whose values
+            depend on it.
+
+        Returns
+        -------
+        value, move : tuple, or None if the position is not cached.
+        """
+        self._open()
+        position = self._position(black, white, turn, depth, color)
+        if position in self._appended:
+            self.hits += 1
+            return self._appended[position][:2]
+        found = self._find(position)
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def put(
+            self, black: int, white: int, turn: int, depth: int, value,
+            move: int, color: int = 0,
+            ):
+        """Save a search result, which is written by `flush`."""
+        self._open()
+        position = self._position(black, white, turn, depth, color)
+        generation = self._generation & 0xff
+        self._appended[position] = (value, move, generation)
+        self._pending.append(_RECORD.pack(
+            black, white, value, move, depth, position[2], generation))
+
+    def flush(self):
+        """Append the new records to the file, and compact it if needed."""
+        if self._pending:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(b"".join(self._pending))
+            self._file.flush()
+            self._pending = []
+        if len(self._appended) > max(
+                SearchCache.MIN_COMPACT, self._size * self.compact_ratio):
+            self.compact()
+
+    def _records(self):
+        """Yield the records of the file, the appended ones last."""
+        for index in range(self._size):
+            yield _RECORD.unpack_from(
+                self._map, _HEADER.size + index * _RECORD.size)
+        for (black, white, flags, depth), (value, move, generation) \
+                in self._appended.items():
+            yield black, white, value, move, depth, flags, generation
+
+    def compact(self):
+        """Rewrite the file with all the records sorted.
+
+        If there are more than max_records, records of shallow searches
+        are evicted first, and the oldest among the same depth.
+        """
+        self._open()
+        records = {}
+        for record in self._records():
+            records[record[0], record[1], record[5], record[4]] = record
+        number = len(records)
+        if number > self.max_records:
+            # Generations wrap around at 256, so they are compared by age.
+            generation = self._generation & 0xff
+            kept = sorted(
+                records.values(),
+                key=lambda record: (
+                    record[4], -((generation - record[6]) & 0xff)),
+                reverse=True)[:self.max_records]
+            records = dict(
+                ((record[0], record[1], record[5], record[4]), record)
+                for record in kept)
+        generation = self._generation + 1
+        temporary = self.filename + ".tmp"
+        with open(temporary, "wb") as file_:
+            file_.write(_HEADER.pack(_MAGIC, len(records), generation))
+            for position in sorted(records):
+                file_.write(_RECORD.pack(*records[position]))
+        # The new records are in the rewritten file.
+        self._pending = []
+        self.close()
+        os.replace(temporary, self.filename)
+        logger.info("Search cache %s was compacted to %d records (%d "
+                    "evicted)." % (self.filename, len(records),
+                                   number - len(records)))
+
+    def close(self):
+        """Write the new records and unmap the file."""
+        if self._pending and self._file is not None:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(b"".join(self._pending))
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = None
+        self._appended = {}
+        self._pending = []
+        self._opened = False
@@ -0,0 +1,148 @@
+"""A transposition table in shared memory for searches in processes."""
+
+from multiprocessing import resource_tracker, shared_memory
+import sys
+import weakref
+
+from .transposition import TranspositionTable
+
+
+def _attach(name: str):
+    """Attach a shared memory block without tracking it here.
+
+    Before Python 3.13, an attached block is registered to the resource
+    tracker as if it was created (bpo-38119). A worker with its own tracker
+    would unlink the block at exit, or warn that it was leaked after the
+    creator unlinked it. Unregistering it instead would break a tracker
+    shared with the creator, so the registration is skipped.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """TranspositionTable which processes can share without locks.
+
+    The block starts with the number of entries and the generation, and an
+    entry is 16 bytes: the key XOR the packed data, and the packed data.
+    A probe accepts an entry only if both words agree with the key, so an
+    entry torn by another process's write is read as a miss.
+
+    Parameters
+    ----------
+    memory : int
+        Memory budget in bytes, used when the table is created.
+    name : str (optional)
+        Name of the shared memory block to attach. If None, a new block is
+        created and unlinked when this object is closed or collected.
+    """
+
+    __all__ = [
+        "probe", "store", "new_search", "clear", "stats", "occupancy",
+        "close",
+    ]
+
+    HEADER = 2
+
+    def __init__(self, memory: int = 4 << 20, name: str = None):
+        if name is None:
+            size = 1
+            while size * 2 * TranspositionTable.ENTRY_SIZE <= memory:
+                size *= 2
+            self._shm = shared_memory.SharedMemory(
+                create=True,
+                size=8 * (SharedTranspositionTable.HEADER + 2*size))
+            self._table = self._shm.buf.cast("Q")
+            self._table[0] = size
+            self.owner = True
+        else:
+            # Only the creator unlinks the block.
+            self._shm = _attach(name)
+            self._table = self._shm.buf.cast("Q")
+            size = self._table[0]
+            self.owner = False
+        self.name = self._shm.name
+        self._mask = size - 1
+        self._finalizer = weakref.finalize(
+            self, SharedTranspositionTable._close, self._table, self._shm,
+            self.owner)
+
+        # Counters of this process.
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @staticmethod
+    def _close(table, shm, owner):
+        table.release()
+        shm.close()
+        if owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __reduce__(self):
+        # Another process attaches the same block.
+        return (SharedTranspositionTable, (0, self.name))
+
+    def probe(self, key: int):
+        """Look up a position, as `TranspositionTable.probe`."""
+        index = SharedTranspositionTable.HEADER + 2*(key & self._mask)
+        table = self._table
+        check = table[index]
+        data = table[index + 1]
+        if data and check ^ data == key:
+            self.hits += 1
+            return self.unpack(data)
+        if data:
+            self.collisions += 1
+        else:
+            self.misses += 1
+        return None
+
+    def store(
+            self, key: int, depth: int, bound: int, value, move: int = None,
+            ):
+        """Save a search result, as `TranspositionTable.store`."""
+        index = SharedTranspositionTable.HEADER + 2*(key & self._mask)
+        table = self._table
+        data = table[index + 1]
+        if data and table[index] ^ data != key:
+            if (data & 0xff) == table[1] \
+                    and ((data >> 17) & 0x7f) > depth:
+                return
+            self.overwrites += 1
+        if move is None:
+            move = TranspositionTable.NO_MOVE
+        data = self.pack(value, depth, bound, move, table[1])
+        table[index + 1] = data
+        table[index] = key ^ data
+        self.stores += 1
+
+    def new_search(self):
+        """Age the entries stored so far, for all the processes."""
+        self._table[1] = (self._table[1] + 1) & 0xff
+
+    def clear(self):
+        start = 8 * SharedTranspositionTable.HEADER
+        self._shm.buf[start:] = bytes(len(self._shm.buf) - start)
+
+    def occupancy(self):
+        """Return the ratio of the used entries."""
+        data = self._table[
+            SharedTranspositionTable.HEADER + 1:
+            SharedTranspositionTable.HEADER + 2*len(self):2]
+        return sum(1 for entry in data if entry) / len(self)
+
+    def close(self):
+        """Detach the block, and unlink it if this object created it."""
+        self._finalizer()
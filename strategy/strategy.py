@@ -1,10 +1,15 @@
 """Various strategies for othello."""
 
+import os
+
 from bitboard import OthelloGame
 
+from .book import load_book
 from .maximize import Maximize
 from .minimize import Minimize
 from .minmax import Minmax
+from .negamax import Negamax
+from .parallel import ParallelSearch
 # from .minmax_fixing import MinmaxNew
 from .random import Random
 
@@ -17,15 +22,43 @@ class Strategy(OthelloGame):
     random : Put disk randomly.
     maximize : Put disk to maximize number of one's disks.
     minimize : Put disk to minimize number of one's disks.
+    min-max : Search by min-max method.
+    negamax : Search by negamax alpha-beta method with null windows.
+    parallel : Search as negamax, with the root moves split across
+        processes by `ParallelSearch`.
+        The long ones read the last ENDGAME empties to the end.
+        The long ones, and any with a time limit, keep a transposition
+        table of MEMORY bytes.
     openness : Put disk based on openness theory.
     evenness : Put disk based on evenness theory.
     """
+    ENDGAME = 10
+    MEMORY = 4 << 20
+
     def __init__(self, othello, strategy: str = "random"):
         self._othello = othello
         self._player_clr = othello.return_turn()
         self.set_strategy(strategy)
 
-    def set_strategy(self, strategy: str):
+    def set_strategy(
+            self, strategy: str, time_limit: float = None,
+            workers: int = None,
+            ):
+        """
+        Parameters
+        ----------
+        strategy : str
+            Name of the strategy.
+        time_limit : float (optional)
+            Seconds per move of the min-max strategies. If given, their
+            depth is the maximum of the iterative deepening.
+        workers : int (optional)
+            Number of processes of the parallel strategies, which defaults
+            to the number of CPUs. It is limited to the number of CPUs,
+            since workers sharing a CPU only slow the search down.
+        """
+        # The table pays only when the search is deep or deepened.
+        memory = 0 if time_limit is None else Strategy.MEMORY
         if strategy == "random":
             self._strategy = Random()
         elif strategy == "maximize":
@@ -33,13 +66,35 @@ class Strategy(OthelloGame):
         elif strategy == "minimize":
             self._strategy = Minimize()
         elif strategy == "min-max short":
-            self._strategy = Minmax(2)
+            self._strategy = Minmax(2, memory, time_limit=time_limit)
         elif strategy == "min-max":
-            self._strategy = Minmax(4)
+            self._strategy = Minmax(4, memory, time_limit=time_limit)
         elif strategy == "min-max long":
-            self._strategy = Minmax(6)
+            self._strategy = Minmax(
+                6, Strategy.MEMORY, Strategy.ENDGAME, time_limit)
+        elif strategy == "negamax short":
+            self._strategy = Negamax(2, memory, time_limit=time_limit)
+        elif strategy == "negamax":
+            self._strategy = Negamax(4, memory, time_limit=time_limit)
+        elif strategy == "negamax long":
+            self._strategy = Negamax(
+                6, Strategy.MEMORY, Strategy.ENDGAME, time_limit)
+        elif strategy in ("parallel", "parallel long"):
+            workers = min(workers or os.cpu_count(), os.cpu_count() or 1)
+            if strategy == "parallel":
+                self._strategy = ParallelSearch(
+                    4, memory, time_limit=time_limit, workers=workers)
+            else:
+                self._strategy = ParallelSearch(
+                    6, Strategy.MEMORY, Strategy.ENDGAME, time_limit,
+                    workers=workers)
         else:
             raise KeyError
+        if workers is not None \
+                and not isinstance(self._strategy, ParallelSearch):
+            raise ValueError("%s is not a parallel strategy." % strategy)
+        if isinstance(self._strategy, Minmax):
+            self._strategy.book = load_book()
 
     def selecter(self, othello):
         return self._strategy.put_disk(othello)
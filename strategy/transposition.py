@@ -0,0 +1,168 @@
+"""A fixed-size transposition table for the min-max strategies."""
+
+from array import array
+
+
+class TranspositionTable:
+    """Store search results of positions in a fixed memory budget.
+
+    An entry is a 64-bit Zobrist key and 64-bit packed data.
+
+        bits  0- 7 : generation of the search which stored the entry
+        bits  8-14 : best move (0 to 63), or NO_MOVE
+        bits 15-16 : bound (EXACT, LOWER or UPPER), 0 for an empty slot
+        bits 17-23 : searched depth
+        bits 24-63 : evaluation + VALUE_OFFSET
+
+    Evaluations are stored exactly, so they must be intagers. Values out
+    of the 40 bits are clamped, which is far beyond the win value.
+
+    Parameters
+    ----------
+    memory : int
+        Memory budget in bytes. The number of entries is the largest power
+        of 2 which fits in it.
+    """
+
+    __all__ = ["probe", "store", "new_search", "clear", "stats"]
+
+    ENTRY_SIZE = 16
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+    NO_MOVE = 127
+    VALUE_OFFSET = 1 << 39
+
+    def __init__(self, memory: int = 4 << 20):
+        size = 1
+        while size * 2 * TranspositionTable.ENTRY_SIZE <= memory:
+            size *= 2
+        self._mask = size - 1
+        self._keys = array("Q", bytes(8 * size))
+        self._data = array("Q", bytes(8 * size))
+        self._generation = 0
+
+        # Counters.
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def __len__(self):
+        return self._mask + 1
+
+    @staticmethod
+    def pack(value, depth, bound, move, generation):
+        """Return the packed data of an entry.
+
+        Raises
+        ------
+        ValueError
+            If value is not an intager, which could not be stored exactly.
+        """
+        if int(value) != value:
+            raise ValueError("Value %r is not an intager." % (value,))
+        value = int(
+            min(max(value, 1 - TranspositionTable.VALUE_OFFSET),
+                TranspositionTable.VALUE_OFFSET - 1))
+        return (
+            (value + TranspositionTable.VALUE_OFFSET) << 24
+            | min(depth, 127) << 17
+            | bound << 15
+            | move << 8
+            | generation
+        )
+
+    @staticmethod
+    def unpack(data):
+        """Return value, depth, bound and move of packed data."""
+        return (
+            (data >> 24) - TranspositionTable.VALUE_OFFSET,
+            (data >> 17) & 0x7f,
+            (data >> 15) & 0x3,
+            (data >> 8) & 0x7f,
+        )
+
+    def probe(self, key: int):
+        """Look up a position.
+
+        Parameters
+        ----------
+        key : int
+            64-bit Zobrist key.
+
+        Returns
+        -------
+        entry : tuple or None
+            (value, depth, bound, move) if the position was stored.
+        """
+        index = key & self._mask
+        data = self._data[index]
+        if data and self._keys[index] == key:
+            self.hits += 1
+            return self.unpack(data)
+        if data:
+            self.collisions += 1
+        else:
+            self.misses += 1
+        return None
+
+    def store(
+            self, key: int, depth: int, bound: int, value, move: int = None,
+            ):
+        """Save a search result.
+
+        An entry of another position is replaced only if it was stored by
+        an older search or was not searched deeper than this one.
+
+        Parameters
+        ----------
+        key : int
+            64-bit Zobrist key.
+        depth : int
+            Remaining depth of the search.
+        bound : int
+            EXACT, LOWER or UPPER.
+        value : int
+            Evaluation of the position. A float is allowed if it is an
+            intager, as 1e10.
+        move : int (optional)
+            Best move, integer from 0 to 63.
+        """
+        index = key & self._mask
+        data = self._data[index]
+        if data and self._keys[index] != key:
+            if (data & 0xff) == self._generation \
+                    and ((data >> 17) & 0x7f) > depth:
+                return
+            self.overwrites += 1
+        if move is None:
+            move = TranspositionTable.NO_MOVE
+        self._keys[index] = key
+        self._data[index] = self.pack(
+            value, depth, bound, move, self._generation)
+        self.stores += 1
+
+    def new_search(self):
+        """Age the entries stored so far."""
+        self._generation = (self._generation + 1) & 0xff
+
+    def clear(self):
+        size = len(self)
+        self._keys = array("Q", bytes(8 * size))
+        self._data = array("Q", bytes(8 * size))
+
+    def stats(self):
+        """Return the counters and the ratio of hits in probes."""
+        probes = self.hits + self.misses + self.collisions
+        return {
+            "entries": len(self),
+            "probes": probes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "hit_rate": self.hits / probes if probes else 0.,
+        }